@@ -8,6 +8,7 @@ from contextlib import asynccontextmanager
 
 from config import Config
 from storage.database import CodeMindDatabase
+from utils.http_client import close_http_client
 from utils.logging import get_logger
 
 # Import routers
@@ -33,6 +34,7 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down CodeMind API...")
+    await close_http_client()
 
 
 # Create FastAPI app
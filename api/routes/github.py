@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Request, Header
 from typing import Optional
 from api.models import GitHubWebhookResponse
 from services.code_review_service import CodeReviewService
+from utils.http_client import GITHUB_DIFF_HEADERS, get_http_client
 from utils.logging import get_logger
 
 router = APIRouter()
@@ -70,16 +71,13 @@ async def handle_github_webhook(
         database = app_request.app.state.database
 
         # Download diff content
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(diff_url)
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to download diff: {response.status_code}",
-                )
-            diff_content = response.text
+        response = await get_http_client().get(diff_url, headers=GITHUB_DIFF_HEADERS)
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to download diff: {response.status_code}",
+            )
+        diff_content = response.text
 
         # Create review service and review the diff
         review_service = CodeReviewService(config=config)
@@ -124,8 +122,6 @@ async def post_github_review(
             logger.warning("No GitHub token configured, cannot post review")
             return False
 
-        import httpx
-
         # Format review content
         formatted_review = f"""## 🤖 AI Code Review
 
@@ -143,17 +139,16 @@ async def post_github_review(
         }
         data = {"body": formatted_review}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=data)
-
-            if response.status_code == 201:
-                logger.info(f"Successfully posted review to PR #{pr_number}")
-                return True
-            else:
-                logger.error(
-                    f"Failed to post GitHub comment: {response.status_code} - {response.text}"
-                )
-                return False
+        response = await get_http_client().post(url, headers=headers, json=data)
+
+        if response.status_code == 201:
+            logger.info(f"Successfully posted review to PR #{pr_number}")
+            return True
+        else:
+            logger.error(
+                f"Failed to post GitHub comment: {response.status_code} - {response.text}"
+            )
+            return False
 
     except Exception as e:
         logger.error(f"Error posting GitHub review: {e}")
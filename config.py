@@ -42,11 +42,26 @@ class Config:
     min_chunk_size: int = 10  # minimum lines per chunk
     chunk_overlap_size: int = 10  # overlap between chunks
 
+    # Embedding cache configuration; unchanged chunks reuse their stored vectors
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = ".code-mind/embeddings.sqlite"
+
+    # Review cache configuration; identical diffs reuse their cached review
+    semantic_cache_enabled: bool = False
+    semantic_cache_ttl_seconds: int = 86400
+
+    # Search result cache configuration; near-duplicate queries reuse results
+    search_cache_enabled: bool = True
+    search_cache_threshold: float = 0.95  # minimum cosine similarity for a hit
+    search_cache_size: int = 1024
+    search_cache_ttl_seconds: int = 300
+
     # Rate limiting configuration
     local_requests_per_minute: int = 300  # Higher limit for local models
     local_requests_per_second: float = 10.0  # 10 requests per second for local
     remote_requests_per_minute: int = 20  # Conservative for remote APIs
     remote_requests_per_second: float = 0.5  # 0.5 requests per second for remote
+    max_concurrent_requests: int = 5  # requests in flight per client
 
     # Model configurations
     embedding: ModelConfig = field(
@@ -2,8 +2,10 @@
 Common data types for code chunking.
 """
 
+import sys
 from typing import Optional
 from dataclasses import dataclass
+from functools import cached_property
 
 
 @dataclass
@@ -19,3 +21,9 @@ class CodeChunk:
     parent_type: Optional[str] = None
     full_signature: Optional[str] = None
     docstring: Optional[str] = None
+
+    @cached_property
+    def chunk_id(self) -> str:
+        """Identifier used in the dependency graph: file_path:start_line:end_line."""
+        # Interned since the same id is stored on many dependency edges
+        return sys.intern(f"{self.file_path}:{self.start_line}:{self.end_line}")
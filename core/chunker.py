@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List
 from pathlib import Path
 
 from core.generic_extractor import GenericChunkExtractor
@@ -24,7 +24,25 @@ class TreeSitterChunker:
 
     def chunk_repository(self, repo_path: str) -> List[CodeChunk]:
         """Extract chunks from repository."""
-        chunks = []
+        return list(self.iter_repository(repo_path))
+
+    def iter_repository(self, repo_path: str) -> Iterator[CodeChunk]:
+        """Extract chunks from repository one file at a time, as they are found."""
+        for file_path in self.iter_source_files(repo_path):
+            try:
+                content = file_path.read_text(encoding="utf-8")
+                file_chunks = self.chunk_file(str(file_path), content)
+            except UnicodeDecodeError:
+                logger.debug(f"Skipping binary file: {file_path}")
+                continue
+            except Exception as e:
+                logger.warning(f"Error reading file {file_path}: {e}")
+                continue
+
+            yield from file_chunks
+
+    def iter_source_files(self, repo_path: str) -> Iterator[Path]:
+        """Find the repository files that are chunked, honouring .gitignore."""
         repo_path = Path(repo_path)
 
         # Initialize gitignore parser for this repository
@@ -51,18 +69,7 @@ class TreeSitterChunker:
             if not self.extractor.is_supported_file(str(file_path)):
                 continue
 
-            try:
-                content = file_path.read_text(encoding="utf-8")
-                file_chunks = self.chunk_file(str(file_path), content)
-                chunks.extend(file_chunks)
-            except UnicodeDecodeError:
-                logger.debug(f"Skipping binary file: {file_path}")
-                continue
-            except Exception as e:
-                logger.warning(f"Error reading file {file_path}: {e}")
-                continue
-
-        return chunks
+            yield file_path
 
     def get_supported_languages(self) -> List[str]:
         """Get list of supported languages."""
@@ -33,6 +33,7 @@ class GenericChunkExtractor:
             if parser and config:
                 try:
                     tree = parser.parse(content.encode("utf-8"))
+                    lines = content.split("\n")
                     chunks = []
 
                     # Extract different types of chunks
@@ -40,7 +41,7 @@ class GenericChunkExtractor:
                         chunks.extend(
                             self._extract_chunks_by_type(
                                 tree.root_node,
-                                content,
+                                lines,
                                 file_path,
                                 language,
                                 chunk_type,
@@ -70,22 +71,27 @@ class GenericChunkExtractor:
     def _extract_chunks_by_type(
         self,
         root_node: Node,
-        content: str,
+        lines: List[str],
         file_path: str,
         language: str,
         chunk_type: str,
         node_types: List[str],
     ) -> List[CodeChunk]:
-        """Extract chunks of a specific type."""
+        """Extract chunks of a specific type, walking the tree with a cursor."""
         chunks = []
-        lines = content.split("\n")
+        cursor = root_node.walk()
+        # Parent name and type for the children of each node on the current path
+        parents = [(None, None)]
+
+        while True:
+            node = cursor.node
+            parent_name, parent_type = parents[-1]
+            descend = True
 
-        def traverse(node: Node, parent_name: str = None, parent_type: str = None):
             # Check if this node matches our target types
             if node.type in node_types:
                 chunk = self._create_chunk(
                     node,
-                    content,
                     lines,
                     file_path,
                     language,
@@ -98,21 +104,23 @@ class GenericChunkExtractor:
 
                     # For classes, continue traversing to find methods
                     if chunk_type == "class":
-                        for child in node.children:
-                            traverse(child, chunk.name, chunk_type)
-                    return  # Don't traverse children for other types
+                        parent_name, parent_type = chunk.name, chunk_type
+                    else:
+                        descend = False  # Don't traverse children for other types
 
-            # Continue traversing
-            for child in node.children:
-                traverse(child, parent_name, parent_type)
+            if descend and cursor.goto_first_child():
+                parents.append((parent_name, parent_type))
+                continue
 
-        traverse(root_node)
-        return chunks
+            # Move on to the next sibling, climbing out of finished subtrees
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return chunks
+                parents.pop()
 
     def _create_chunk(
         self,
         node: Node,
-        content: str,
         lines: List[str],
         file_path: str,
         language: str,
@@ -132,10 +140,10 @@ class GenericChunkExtractor:
             name = self._extract_name(node, language)
 
             # Extract signature
-            signature = self._extract_signature(node, content, language)
+            signature = self._extract_signature(node, lines, language)
 
             # Extract docstring
-            docstring = self._extract_docstring(node, content, language)
+            docstring = self._extract_docstring(node, lines, language)
 
             return CodeChunk(
                 content=chunk_content,
@@ -173,7 +181,7 @@ class GenericChunkExtractor:
         return None
 
     def _extract_signature(
-        self, node: Node, content: str, language: str
+        self, node: Node, lines: List[str], language: str
     ) -> Optional[str]:
         """Extract the full signature of a function/method."""
         try:
@@ -183,7 +191,6 @@ class GenericChunkExtractor:
                 "function_definition",
                 "method_definition",
             ]:
-                lines = content.split("\n")
                 start_line = node.start_point[0]
 
                 # Look for the signature (usually first line or until opening brace/colon)
@@ -209,7 +216,7 @@ class GenericChunkExtractor:
             return None
 
     def _extract_docstring(
-        self, node: Node, content: str, language: str
+        self, node: Node, lines: List[str], language: str
     ) -> Optional[str]:
         """Extract docstring/comment for a code element."""
         try:
@@ -219,16 +226,16 @@ class GenericChunkExtractor:
 
             # Language-specific docstring extraction
             if language == "python":
-                return self._extract_python_docstring(node, content)
+                return self._extract_python_docstring(node)
             elif language in ["javascript", "typescript"]:
-                return self._extract_js_docstring(node, content)
+                return self._extract_js_docstring(node, lines)
             else:
-                return self._extract_generic_comment(node, content, config)
+                return self._extract_generic_comment(node, lines, config)
 
         except Exception:
             return None
 
-    def _extract_python_docstring(self, node: Node, content: str) -> Optional[str]:
+    def _extract_python_docstring(self, node: Node) -> Optional[str]:
         """Extract Python docstring."""
         # Look for string literal as first statement in function/class body
         for child in node.children:
@@ -242,9 +249,8 @@ class GenericChunkExtractor:
                             return docstring.strip('"""').strip("'''").strip()
         return None
 
-    def _extract_js_docstring(self, node: Node, content: str) -> Optional[str]:
+    def _extract_js_docstring(self, node: Node, lines: List[str]) -> Optional[str]:
         """Extract JavaScript/TypeScript JSDoc comment."""
-        lines = content.split("\n")
         start_line = node.start_point[0]
 
         # Look for JSDoc comment before the function
@@ -267,10 +273,9 @@ class GenericChunkExtractor:
         return None
 
     def _extract_generic_comment(
-        self, node: Node, content: str, config: LanguageConfig
+        self, node: Node, lines: List[str], config: LanguageConfig
     ) -> Optional[str]:
         """Extract generic comment for any language."""
-        lines = content.split("\n")
         start_line = node.start_point[0]
 
         # Look for comments before the code element
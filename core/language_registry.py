@@ -7,7 +7,6 @@ import importlib
 import pkgutil
 from typing import Dict, List, Optional
 from dataclasses import dataclass
-from pathlib import Path
 
 from tree_sitter import Language, Parser
 from utils.logging import get_logger
@@ -493,15 +492,18 @@ class LanguageRegistry:
 
     def get_language_for_file(self, file_path: str) -> Optional[str]:
         """Get the language for a file based on its extension."""
-        path = Path(file_path)
+        # Plain string ops instead of building a Path for every lookup
+        name = file_path.replace("\\", "/").rsplit("/", 1)[-1]
 
         # Handle special cases
-        if path.name in ["Dockerfile", "dockerfile"]:
+        if name in ("Dockerfile", "dockerfile"):
             return "dockerfile" if "dockerfile" in self.languages else None
 
-        # Check extensions
-        ext = path.suffix.lower()
-        return self.extension_map.get(ext)
+        # Check extensions (dotfiles like ".bashrc" have none)
+        dot = name.rfind(".")
+        if dot <= 0 or dot == len(name) - 1:
+            return None
+        return self.extension_map.get(name[dot:].lower())
 
     def get_parser(self, language: str) -> Optional[Parser]:
         """Get the Tree-sitter parser for a language."""
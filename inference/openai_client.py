@@ -1,6 +1,8 @@
 import time
 import asyncio
-from typing import List, Dict, Any, Optional
+import hashlib
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Any, Optional
 from dataclasses import dataclass
 from openai import AsyncOpenAI
 from openai import RateLimitError, APIError
@@ -94,9 +96,16 @@ class RateLimiter:
                 )
 
 
+# Requests in flight per client, e.g. embedding batches sent while indexing
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
+
 # Global rate limiter instance
 _rate_limiter = RateLimiter()
 
+# Recent query embeddings shared by all clients, keyed by sha256(model, text)
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+_query_embeddings: "OrderedDict[bytes, List[float]]" = OrderedDict()
+
 
 @dataclass
 class EmbeddingResponse:
@@ -125,7 +134,9 @@ class LLMClient:
         self.config = config
         self._clients: Dict[str, AsyncOpenAI] = {}
         # Limit concurrent requests to prevent overwhelming the API
-        self._semaphore = asyncio.Semaphore(5)  # Max 5 concurrent requests
+        self._semaphore = asyncio.Semaphore(
+            getattr(config, "max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS)
+        )
         self._rate_limiter_configured = False
 
     async def _retry_with_backoff(self, func, *args, max_retries=2, **kwargs):
@@ -294,6 +305,23 @@ class LLMClient:
 
                 return response.data[0].embedding
 
+    async def embed_query(self, text: str) -> List[float]:
+        """Create embedding for a query, reusing recent results for the same text."""
+        model_config = getattr(self.config, "embedding", None)
+        model_name = model_config.model_name if model_config else ""
+        key = hashlib.sha256(f"{model_name}\0{text}".encode()).digest()
+
+        embedding = _query_embeddings.get(key)
+        if embedding is not None:
+            _query_embeddings.move_to_end(key)
+            return embedding
+
+        embedding = await self.embed(text)
+        _query_embeddings[key] = embedding
+        if len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+            _query_embeddings.popitem(last=False)
+        return embedding
+
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """Create embeddings for multiple texts."""
         async with self._semaphore:
@@ -406,13 +434,47 @@ class LLMClient:
 
                 return response.choices[0].message.content
 
-    async def rerank(
-        self, query: str, documents: List[str], top_k: int = 5
-    ) -> List[Dict[str, Any]]:
-        """Rerank documents using instruction model."""
+    async def stream_complete(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: Optional[ModelConfig] = None,
+    ) -> AsyncIterator[str]:
+        """Create completion, yielding text fragments as they are generated."""
+        async with self._semaphore:
+            telemetry = get_telemetry()
+
+            if model_config is None:
+                model_config = getattr(self.config, "completion", None)
+
+            client = self._get_client_for_model(model_config)
+            model_name_for_telemetry = model_config.model_name
+
+            with telemetry.trace_operation(
+                "stream_complete",
+                {"model": model_name_for_telemetry, "message_count": len(messages)},
+            ):
+                stream = await self._retry_with_backoff(
+                    client.chat.completions.create,
+                    model=model_name_for_telemetry,
+                    messages=messages,
+                    temperature=getattr(self.config, "review_temperature", 0.1),
+                    max_tokens=getattr(self.config, "max_tokens", 2048),
+                    stream=True,
+                )
+
+                self._record_telemetry("complete", model_name_for_telemetry, 0)
+
+                async for event in stream:
+                    if event.choices and event.choices[0].delta.content:
+                        yield event.choices[0].delta.content
+
+    def _rerank_messages(
+        self, query: str, documents: List[str]
+    ) -> List[Dict[str, str]]:
+        """Build the ranking prompt for a set of documents."""
         docs_text = "\n".join([f"{i + 1}. {doc}" for i, doc in enumerate(documents)])
 
-        messages = [
+        return [
             {
                 "role": "system",
                 "content": "Rank code snippets by relevance to the query. Return only document numbers, comma-separated.",
@@ -423,6 +485,12 @@ class LLMClient:
             },
         ]
 
+    async def rerank(
+        self, query: str, documents: List[str], top_k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Rerank documents using instruction model."""
+        messages = self._rerank_messages(query, documents)
+
         response = await self.complete(
             messages, model_config=getattr(self.config, "rerank", None)
         )
@@ -18,11 +18,14 @@ import asyncio
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 from config import Config
-from services.codebase_service import CodebaseService
+from services.codebase_service import CodebaseService, wait_for_background_tasks
 from services.code_review_service import CodeReviewService
 from storage.database import CodeMindDatabase
 from utils.logging import setup_logging, get_logger
 
+REVIEW_RULE = "================================"
+REVIEW_HEADER = f"{REVIEW_RULE}\nCODE REVIEW\n{REVIEW_RULE}"
+
 
 async def index_repository(repo_path: str):
     """Index a repository for code review."""
@@ -53,6 +56,10 @@ async def index_repository(repo_path: str):
         f"Successfully indexed {result.chunks_indexed} chunks in {result.duration:.2f}s"
     )
 
+    # The chunks are searchable already; finish their summaries before exiting
+    logger.info("Generating chunk summaries...")
+    await wait_for_background_tasks()
+
     # Show stats
     repositories = db.list_repositories()
     logger.info(f"Indexing complete. Total repositories: {len(repositories)}")
@@ -80,17 +87,23 @@ async def review_diff(diff_file: str):
     with open(diff_file, "r") as f:
         diff_content = f.read()
 
-    result = await service.review_diff(diff_content)
+    # Print the review as it is generated
+    streamed = False
+
+    def print_token(token: str):
+        nonlocal streamed
+        if not streamed:
+            print(REVIEW_HEADER, flush=True)
+            streamed = True
+        print(token, end="", flush=True)
+
+    result = await service.review_diff(diff_content, on_token=print_token)
     if result:
-        logger.info(
-            f"""
-================================
-CODE REVIEW
-================================
-{result.review_content}
-================================
-"""
-        )
+        if not streamed:
+            # Cached reviews arrive whole
+            print(REVIEW_HEADER)
+            print(result.review_content, end="")
+        print(f"\n{REVIEW_RULE}")
     else:
         logger.error("Failed to review diff")
         sys.exit(1)
@@ -0,0 +1,186 @@
+"""
+On-disk cache of per-file dependency analysis results.
+
+Files are fingerprinted by content hash (with an mtime/size fast path) and
+the grammar version used to parse them; unchanged files reuse their stored
+dependency rows instead of going through Tree-sitter and the language server.
+"""
+
+import hashlib
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the stored rows change meaning so old caches are discarded
+CACHE_SCHEMA_VERSION = 1
+
+# (source_chunk, target_chunk, dependency_type, symbol_name)
+DependencyRow = Tuple[str, str, str, str]
+
+
+@dataclass
+class FileFingerprint:
+    """Identity of a file's analyzed content."""
+
+    sha256: str
+    mtime: float
+    size: int
+    grammar: str
+
+
+class DependencyCache:
+    """SQLite-backed store of dependency rows keyed by file fingerprint."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self):
+        """Create tables, dropping caches written by another schema version."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS deps;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                grammar TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS deps (
+                file TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                type TEXT NOT NULL,
+                symbol TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS deps_file ON deps(file);
+            """
+        )
+        self._conn.commit()
+
+    def fingerprint(
+        self, abs_path: str, file_path: str, grammar: str
+    ) -> Tuple[Optional[FileFingerprint], Optional[bytes]]:
+        """
+        Fingerprint a file, hashing it only if its mtime or size changed.
+
+        Args:
+            abs_path: Absolute path used to read the file
+            file_path: Repo-relative path the cache is keyed by
+            grammar: Language and grammar version the file is parsed with
+
+        Returns:
+            The file's fingerprint (None if it cannot be read) and its
+            contents when they had to be read for hashing
+        """
+        try:
+            stat = os.stat(abs_path)
+            row = self._conn.execute(
+                "SELECT sha256, mtime, size, grammar FROM files WHERE path = ?",
+                (file_path,),
+            ).fetchone()
+            source = None
+            if (
+                row
+                and row[1] == stat.st_mtime
+                and row[2] == stat.st_size
+                and row[3] == grammar
+            ):
+                sha256 = row[0]
+            else:
+                with open(abs_path, "rb") as f:
+                    source = f.read()
+                sha256 = hashlib.sha256(source).hexdigest()
+            fingerprint = FileFingerprint(sha256, stat.st_mtime, stat.st_size, grammar)
+            return fingerprint, source
+        except OSError as e:
+            logger.debug(f"Failed to fingerprint {file_path}: {e}")
+            return None, None
+
+    def load(
+        self, file_path: str, fingerprint: FileFingerprint
+    ) -> Optional[List[DependencyRow]]:
+        """Return the stored rows for a file if its content and grammar match."""
+        row = self._conn.execute(
+            "SELECT sha256, grammar FROM files WHERE path = ?", (file_path,)
+        ).fetchone()
+        if not row or row[0] != fingerprint.sha256 or row[1] != fingerprint.grammar:
+            return None
+
+        # Content unchanged; keep the stat fields fresh for the fast path
+        self._conn.execute(
+            "UPDATE files SET mtime = ?, size = ? WHERE path = ?",
+            (fingerprint.mtime, fingerprint.size, file_path),
+        )
+        return self._conn.execute(
+            "SELECT source, target, type, symbol FROM deps WHERE file = ?",
+            (file_path,),
+        ).fetchall()
+
+    def store(
+        self, file_path: str, fingerprint: FileFingerprint, rows: List[DependencyRow]
+    ):
+        """Replace the stored rows and fingerprint of a file."""
+        with self._conn:
+            self._conn.execute("DELETE FROM deps WHERE file = ?", (file_path,))
+            self._conn.executemany(
+                "INSERT INTO deps (file, source, target, type, symbol) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(file_path, *row) for row in rows],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, sha256, mtime, size, grammar) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    file_path,
+                    fingerprint.sha256,
+                    fingerprint.mtime,
+                    fingerprint.size,
+                    fingerprint.grammar,
+                ),
+            )
+
+    def prune(self, keep_paths: Set[str]) -> int:
+        """
+        Delete cached entries for files that are no longer part of the repository.
+
+        Args:
+            keep_paths: Repo-relative paths of every file still being analyzed
+
+        Returns:
+            Number of files removed from the cache
+        """
+        stale = [
+            (path,)
+            for (path,) in self._conn.execute("SELECT path FROM files")
+            if path not in keep_paths
+        ]
+        if stale:
+            with self._conn:
+                self._conn.executemany("DELETE FROM deps WHERE file = ?", stale)
+                self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        return len(stale)
+
+    def commit(self):
+        """Flush pending fingerprint updates."""
+        self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.commit()
+        self._conn.close()
@@ -1,8 +1,29 @@
-from typing import List, Dict, Optional
+import os
+import sys
+import posixpath
+import asyncio
+import builtins
+import json
+import keyword
+import types
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, FrozenSet, Optional, Set, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import unquote
 
-from tree_sitter import Parser, Node
+from tree_sitter import Parser
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from multilspy import LanguageServer
 from multilspy.multilspy_config import MultilspyConfig
@@ -10,10 +31,119 @@ from multilspy.multilspy_logger import MultilspyLogger
 
 from core.chunk_types import CodeChunk
 from core.language_registry import get_language_registry
+from processing.dependency_cache import DependencyCache, FileFingerprint
+from processing.symbol_extractor import SymbolReference, extract_file_references
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Default location of the dependency cache, relative to the repository root
+DEPENDENCY_CACHE_PATH = ".code-mind/dep_cache.sqlite"
+
+# Default number of definition requests in flight per language server
+MAX_INFLIGHT_DEFINITIONS = 16
+
+# JavaScript/TypeScript keywords and standard globals
+_JS_BUILTINS = frozenset(
+    """
+    arguments async await break case catch class const continue debugger default
+    delete do else export extends false finally for function if import in
+    instanceof let new null return super switch this throw true try typeof
+    undefined var void while with yield Array ArrayBuffer BigInt Boolean Date
+    Error Function Infinity Intl JSON Map Math NaN Number Object Promise Proxy
+    RangeError Reflect RegExp Set String Symbol TypeError Uint8Array WeakMap
+    WeakSet clearInterval clearTimeout console decodeURIComponent document
+    encodeURIComponent exports fetch globalThis isFinite isNaN module parseFloat
+    parseInt process require setInterval setTimeout window
+    """.split()
+)
+
+# Languages whose imports are resolved statically instead of through LSP
+STATIC_IMPORT_LANGUAGES = frozenset({"python", "javascript", "typescript"})
+
+# Extensions tried, in order, for extensionless JavaScript/TypeScript imports
+JS_MODULE_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+# Names per language that never resolve to a chunk in the repository
+BUILTIN_SYMBOLS: Dict[str, FrozenSet[str]] = {
+    "python": frozenset(keyword.kwlist)
+    | frozenset(dir(builtins))
+    | frozenset({"self", "cls"}),
+    "javascript": _JS_BUILTINS,
+    "typescript": _JS_BUILTINS
+    | frozenset(
+        """
+        any bigint boolean never number object string symbol unknown Omit
+        Partial Pick Readonly Record Required ReturnType
+        """.split()
+    ),
+}
+
+# (dependency type, target chunk type) pairs that keep their dependency type;
+# the chunkers emit "function"/"class", the *_definition names are kept for
+# chunks produced elsewhere
+REFINED_DEPENDENCY_TYPES: Dict[Tuple[str, str], str] = {
+    ("calls", "function"): "calls",
+    ("calls", "function_definition"): "calls",
+    ("calls", "method_definition"): "calls",
+    ("instantiates", "class"): "instantiates",
+    ("instantiates", "class_definition"): "instantiates",
+    ("inherits", "class"): "inherits",
+    ("inherits", "class_definition"): "inherits",
+}
+
+
+@lru_cache(maxsize=4096)
+def _uri_to_relative_path(file_uri: str, repo_root: str) -> str:
+    """Strip the file scheme and repo root from a URI; other paths pass through."""
+    # multilspy returns file URIs, convert back to relative path
+    if not file_uri.startswith("file://"):
+        return sys.intern(file_uri)
+
+    # Servers percent-encode spaces and non-ASCII characters in URIs
+    file_path = unquote(file_uri[len("file://") :])
+    if file_path.startswith(repo_root + "/"):
+        file_path = file_path[len(repo_root) + 1 :]
+    return sys.intern(file_path)
+
+
+# multilspy modules that encode/decode JSON-RPC messages with the json module
+LSP_JSON_MODULES = (
+    "multilspy.lsp_protocol_handler.server",
+    "multilspy.lsp_protocol_handler.ls_handler",
+    "multilspy.language_server",
+)
+
+
+def _install_fast_lsp_json():
+    """Swap the json module used by multilspy's transport for an orjson shim."""
+    if not ORJSON_AVAILABLE:
+        return
+
+    def dumps(obj, *, sort_keys=False, **kwargs):
+        # orjson always writes compact UTF-8, matching multilspy's own options;
+        # sort_keys is kept since multilspy dedupes completions by their JSON
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, option=option).decode("utf-8")
+
+    # A copy of the json module so only multilspy sees the faster functions
+    fast_json = types.ModuleType("json")
+    fast_json.__dict__.update(json.__dict__)
+    fast_json.dumps = dumps
+    fast_json.loads = orjson.loads
+
+    for module_name in LSP_JSON_MODULES:
+        module = sys.modules.get(module_name)
+        if module is not None and getattr(module, "json", None) is json:
+            module.json = fast_json
+            logger.debug(f"Using orjson for LSP messages in {module_name}")
+
+
+try:
+    _install_fast_lsp_json()
+except Exception as e:
+    logger.debug(f"Failed to install orjson for LSP messages: {e}")
+
 
 @dataclass
 class Symbol:
@@ -36,14 +166,170 @@ class Dependency:
     symbol_name: str
 
 
+class AnalysisDebouncer:
+    """Coalesce bursts of analysis requests into a single analyze_repository run."""
+
+    def __init__(self, resolver: "LSPResolver", delay_ms: int = 150):
+        self.resolver = resolver
+        self.delay = delay_ms / 1000
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._future: Optional[asyncio.Future] = None
+        self._chunks: List[CodeChunk] = []
+        self._changed_paths: Optional[Set[str]] = set()
+        self._lock = asyncio.Lock()
+        # Runs in progress; the event loop itself only keeps weak references
+        self._tasks: Set[asyncio.Task] = set()
+
+    def schedule(
+        self, chunks: List[CodeChunk], changed_paths: Optional[Set[str]] = None
+    ) -> asyncio.Future:
+        """
+        Request an analysis, superseding any request still waiting in the window.
+
+        Every caller coalesced into the same window receives the same future.
+        Passing changed_paths=None asks for a full analysis; otherwise the
+        changed paths of all coalesced requests are merged.
+        """
+        loop = asyncio.get_running_loop()
+
+        if self._handle is not None:
+            self._handle.cancel()
+
+        if self._future is None:
+            self._future = loop.create_future()
+            self._changed_paths = set()
+
+        self._chunks = chunks
+        if changed_paths is None:
+            self._changed_paths = None
+        elif self._changed_paths is not None:
+            self._changed_paths.update(changed_paths)
+
+        self._handle = loop.call_later(self.delay, self._fire)
+        return self._future
+
+    def _fire(self):
+        """Start the pending analysis once the debounce window has elapsed."""
+        future, chunks, changed_paths = (
+            self._future,
+            self._chunks,
+            self._changed_paths,
+        )
+        self._handle = None
+        self._future = None
+        task = asyncio.ensure_future(self._run(future, chunks, changed_paths))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        future: asyncio.Future,
+        chunks: List[CodeChunk],
+        changed_paths: Optional[Set[str]],
+    ):
+        """
+        Run one analysis, serialized against any run still in progress.
+
+        The outcome always reaches the shared future, cancellation included,
+        so coalesced callers never wait on a run that has ended.
+        """
+        try:
+            async with self._lock:
+                result = await self.resolver.analyze_repository(
+                    chunks, changed_paths=changed_paths
+                )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        if not future.done():
+            future.set_result(result)
+
+
 class LSPResolver:
-    """Resolve AST-based symbol dependencies and relationships using LSP and Tree-sitter."""
+    """
+    Resolve AST-based symbol dependencies and relationships using LSP and Tree-sitter.
 
-    def __init__(self, repo_path: str):
+    The Tree-sitter phase runs on a worker pool, of processes by default, and
+    the dependency cache keeps its database open between runs. Callers must
+    close() the resolver when done, or use it as an async context manager.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        debounce_ms: int = 150,
+        cache_path: Optional[str] = None,
+        use_cache: bool = True,
+        max_inflight_definitions: int = MAX_INFLIGHT_DEFINITIONS,
+        use_process_pool: bool = True,
+    ):
         self.repo_path = repo_path
+        self.use_process_pool = use_process_pool
+        self.max_inflight_definitions = max(1, max_inflight_definitions)
+        self._repo_root_str = Path(repo_path).resolve().as_posix()
         self.language_servers: Dict[str, LanguageServer] = {}
-        self.dependencies: List[Dependency] = []
+        # Dependencies are stored column-wise; row i of each column is one edge.
+        # Types are one-byte ids into _type_names since only a handful exist
+        self._src: List[str] = []
+        self._tgt: List[str] = []
+        self._type = array("B")
+        self._name: List[str] = []
+        self._type_names: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self._type_counts: Counter = Counter()
+        # Indexes kept in sync with the columns for O(1) dedup and lookups
+        self._dep_keys: Set[Tuple[str, str, str]] = set()
+        self._rows_by_source: Dict[str, List[int]] = defaultdict(list)
+        self._rows_by_target: Dict[str, List[int]] = defaultdict(list)
         self.registry = get_language_registry()
+        self.debounce_ms = debounce_ms
+        self._debouncer: Optional[AnalysisDebouncer] = None
+        # Chunks per file as (start lines, running max end lines, chunks)
+        self._chunks_by_file: Dict[
+            str, Tuple[List[int], List[int], List[CodeChunk]]
+        ] = {}
+        # Dotted module name -> Python file (None when ambiguous)
+        self._python_modules: Dict[str, Optional[str]] = {}
+        # Keywords/builtins skipped before asking the language server
+        self._builtin_skip: Dict[str, FrozenSet[str]] = BUILTIN_SYMBOLS
+        # Definition locations per file and (line, character), reused across runs
+        self._def_cache: Dict[str, Dict[Tuple[int, int], List[Tuple[str, int]]]] = {}
+        # Persistent per-file dependency cache, opened on first analysis
+        self.cache_path = cache_path or str(Path(repo_path) / DEPENDENCY_CACHE_PATH)
+        self.use_cache = use_cache
+        self._dep_cache: Optional[DependencyCache] = None
+        # Worker pool for the CPU-bound Tree-sitter phase, created on first use;
+        # threads skip pickling sources and references, processes scale further
+        self._executor: Optional[Executor] = None
+        # Forward adjacency built from the edges, dropped whenever they change
+        self._adjacency: Optional[Dict[str, List[str]]] = None
+        # Precomputed 2-hop reachability, rebuilt after each analysis
+        self._closure2: Optional[Dict[str, frozenset]] = None
+
+    @property
+    def dependencies(self) -> List[Dependency]:
+        """All dependencies, materialized from the column storage."""
+        type_names = self._type_names
+        return [
+            Dependency(source, target, type_names[type_id], symbol_name)
+            for source, target, type_id, symbol_name in zip(
+                self._src, self._tgt, self._type, self._name
+            )
+        ]
+
+    def _dependency_at(self, row: int) -> Dependency:
+        """Build a Dependency view of one stored row."""
+        return Dependency(
+            self._src[row],
+            self._tgt[row],
+            self._type_names[self._type[row]],
+            self._name[row],
+        )
 
     def _detect_language(self, file_path: str) -> Optional[str]:
         """Detect the programming language based on file extension."""
@@ -53,49 +339,131 @@ class LSPResolver:
         """Get Tree-sitter parser for a language."""
         return self.registry.get_parser(language)
 
-    async def analyze_repository(self, chunks: List[CodeChunk]):
-        """Analyze repository and build symbol table and dependencies using Tree-sitter and LSP."""
+    def analyze_repository_async(
+        self, chunks: List[CodeChunk], changed_paths: Optional[Set[str]] = None
+    ) -> asyncio.Future:
+        """
+        Debounced entry point for watcher/editor driven callers.
+
+        Calls arriving within the debounce window are coalesced into one
+        analyze_repository run; the returned future resolves with its result.
+        """
+        if self._debouncer is None:
+            self._debouncer = AnalysisDebouncer(self, self.debounce_ms)
+        return self._debouncer.schedule(chunks, changed_paths)
+
+    async def analyze_repository(
+        self, chunks: List[CodeChunk], changed_paths: Optional[Set[str]] = None
+    ):
+        """
+        Analyze repository and build symbol table and dependencies using Tree-sitter and LSP.
+
+        Args:
+            chunks: All chunks of the repository (used to resolve definitions)
+            changed_paths: Optional set of file paths to re-analyze. Dependencies
+                originating from other files are kept from the previous run.
+        """
         logger.info(f"Analyzing repository with Tree-sitter + LSP: {self.repo_path}")
 
         try:
+            if changed_paths is not None:
+                self._drop_dependencies_for_files(changed_paths)
+            self._invalidate_definitions(changed_paths)
+
             # Convert repo_path to absolute path
             abs_repo_path = str(Path(self.repo_path).resolve())
             logger.debug(f"Using absolute repo path: {abs_repo_path}")
 
-            chunk_map = {
-                f"{chunk.file_path}:{chunk.start_line}:{chunk.end_line}": chunk
-                for chunk in chunks
-            }
+            chunk_map = {chunk.chunk_id: chunk for chunk in chunks}
+            self._index_chunks_by_file(chunks)
 
             # Group chunks by language and file for more efficient processing
             chunks_by_language = {}
+            # Language (None if unsupported) per file, detected once per file
+            language_by_file: Dict[str, Optional[str]] = {}
             for chunk in chunks:
-                detected_language = self._detect_language(chunk.file_path)
-                if detected_language and self._get_parser(detected_language):
-                    if detected_language not in chunks_by_language:
-                        chunks_by_language[detected_language] = {}
+                if changed_paths is not None and chunk.file_path not in changed_paths:
+                    continue
 
-                    if chunk.file_path not in chunks_by_language[detected_language]:
-                        chunks_by_language[detected_language][chunk.file_path] = []
-                    chunks_by_language[detected_language][chunk.file_path].append(chunk)
+                if chunk.file_path in language_by_file:
+                    detected_language = language_by_file[chunk.file_path]
+                else:
+                    detected_language = self._detect_language(chunk.file_path)
+                    if detected_language and not self._get_parser(detected_language):
+                        detected_language = None
+                    language_by_file[chunk.file_path] = detected_language
+
+                if detected_language:
+                    # Interned so every per-file key shares one string object
+                    file_path = sys.intern(chunk.file_path)
+                    files_dict = chunks_by_language.setdefault(detected_language, {})
+                    files_dict.setdefault(file_path, []).append(chunk)
 
             files_analyzed = 0
             total_symbols = 0
 
-            # Process each language separately with its own language server
-            for language, files_dict in chunks_by_language.items():
-                try:
-                    await self._analyze_language(
-                        language, files_dict, chunk_map, abs_repo_path
-                    )
-                    files_analyzed += len(files_dict)
-                except Exception as e:
-                    logger.warning(f"Failed to analyze {language} files: {e}")
+            # Reuse stored results for files whose content has not changed
+            cache = self._get_dependency_cache()
+            fingerprints: Dict[str, FileFingerprint] = {}
+            sources: Dict[str, bytes] = {}
+            files_cached = 0
+            if cache is not None:
+                files_cached = self._load_cached_files(
+                    cache,
+                    chunks_by_language,
+                    chunk_map,
+                    abs_repo_path,
+                    fingerprints,
+                    sources,
+                )
+                # A full analysis sees every file, so anything else is gone
+                if changed_paths is None:
+                    try:
+                        pruned = cache.prune({chunk.file_path for chunk in chunks})
+                        if pruned:
+                            logger.debug(f"Pruned {pruned} deleted files from cache")
+                    except Exception as e:
+                        logger.warning(f"Failed to prune dependency cache: {e}")
+
+            async def analyze_language(
+                language: str, files_dict: Dict[str, List[CodeChunk]]
+            ) -> int:
+                await self._analyze_language(
+                    language, files_dict, chunk_map, abs_repo_path, sources
+                )
+                if cache is not None:
+                    self._store_cached_files(cache, files_dict, fingerprints)
+                # The per-language file dicts are already keyed by path,
+                # so their sizes give the file count without a second pass
+                return len(files_dict)
+
+            # Each language has its own language server process, so the
+            # languages are analyzed concurrently. Edges are added without
+            # awaiting in between, so the shared indexes need no lock.
+            languages = [
+                (language, files_dict)
+                for language, files_dict in chunks_by_language.items()
+                if files_dict
+            ]
+            results = await asyncio.gather(
+                *(
+                    analyze_language(language, files_dict)
+                    for language, files_dict in languages
+                ),
+                return_exceptions=True,
+            )
+            for (language, _), result in zip(languages, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to analyze {language} files: {result}")
+                else:
+                    files_analyzed += result
 
             logger.info(
-                f"Tree-sitter + LSP analysis complete: {len(self.dependencies)} dependencies found across {files_analyzed} files"
+                f"Tree-sitter + LSP analysis complete: {len(self._src)} dependencies found across {files_analyzed} files ({files_cached} unchanged files loaded from cache)"
             )
 
+            self._build_closure2()
+
             # Detect and analyze circular dependencies
             cycle_analysis = self.get_cycle_analysis()
             if cycle_analysis["has_cycles"]:
@@ -105,8 +473,9 @@ class LSPResolver:
 
             return {
                 "symbols": total_symbols,
-                "dependencies": len(self.dependencies),
+                "dependencies": len(self._src),
                 "files_analyzed": files_analyzed,
+                "files_cached": files_cached,
                 "cycles": cycle_analysis,
             }
 
@@ -114,8 +483,9 @@ class LSPResolver:
             logger.error(f"Tree-sitter + LSP analysis failed: {e}")
             return {
                 "symbols": 0,
-                "dependencies": len(self.dependencies),
+                "dependencies": len(self._src),
                 "files_analyzed": 0,
+                "files_cached": 0,
                 "cycles": {
                     "has_cycles": False,
                     "cycle_count": 0,
@@ -124,12 +494,157 @@ class LSPResolver:
                 },
             }
 
+    def _get_dependency_cache(self) -> Optional[DependencyCache]:
+        """Open the on-disk dependency cache, disabling it if that fails."""
+        if self._dep_cache is None and self.use_cache:
+            try:
+                self._dep_cache = DependencyCache(self.cache_path)
+            except Exception as e:
+                logger.warning(f"Dependency cache disabled ({self.cache_path}): {e}")
+                self.use_cache = False
+        return self._dep_cache
+
+    def _grammar_key(self, language: str) -> str:
+        """Identify the grammar a language is parsed with, for cache invalidation."""
+        parser = self._get_parser(language)
+        ts_language = getattr(parser, "language", None)
+        version = getattr(ts_language, "abi_version", None) or getattr(
+            ts_language, "version", ""
+        )
+        return f"{language}:{version}"
+
+    def _load_cached_files(
+        self,
+        cache: DependencyCache,
+        chunks_by_language: Dict[str, Dict[str, List[CodeChunk]]],
+        chunk_map: Dict[str, CodeChunk],
+        abs_repo_path: str,
+        fingerprints: Dict[str, FileFingerprint],
+        sources: Dict[str, bytes],
+    ) -> int:
+        """
+        Load stored dependencies for unchanged files and drop them from analysis.
+
+        Args:
+            cache: Open dependency cache
+            chunks_by_language: Files to analyze per language; cache hits are removed
+            chunk_map: All chunks by id, used to reject rows pointing at stale chunks
+            abs_repo_path: Absolute repository root
+            fingerprints: Filled with the fingerprint of every file seen
+            sources: Filled with the contents of files that were read for
+                hashing and still need analysis
+
+        Returns:
+            Number of files served from the cache
+        """
+        files_cached = 0
+        for language, files_dict in chunks_by_language.items():
+            grammar = self._grammar_key(language)
+            for file_path in list(files_dict):
+                fingerprint, source = cache.fingerprint(
+                    os.path.join(abs_repo_path, file_path), file_path, grammar
+                )
+                if fingerprint is None:
+                    continue
+                fingerprints[file_path] = fingerprint
+
+                rows = cache.load(file_path, fingerprint)
+                # Edges into chunks that no longer exist mean another file
+                # changed underneath this one, so it has to be re-analyzed
+                if rows is None or any(
+                    source_id not in chunk_map or target_id not in chunk_map
+                    for source_id, target_id, _, _ in rows
+                ):
+                    # Keep the bytes read for hashing so they are not read twice
+                    if source is not None:
+                        sources[file_path] = source
+                    continue
+
+                for row in rows:
+                    self._add_dependency(Dependency(*map(sys.intern, row)))
+                del files_dict[file_path]
+                files_cached += 1
+
+        cache.commit()
+        return files_cached
+
+    def _store_cached_files(
+        self,
+        cache: DependencyCache,
+        files_dict: Dict[str, List[CodeChunk]],
+        fingerprints: Dict[str, FileFingerprint],
+    ):
+        """Persist the dependencies found for freshly analyzed files."""
+        for file_path, file_chunks in files_dict.items():
+            fingerprint = fingerprints.get(file_path)
+            if fingerprint is None:
+                continue
+
+            rows = []
+            for chunk in file_chunks:
+                chunk_id = chunk.chunk_id
+                for row in self._rows_by_source.get(chunk_id, []):
+                    dep = self._dependency_at(row)
+                    rows.append(
+                        (
+                            dep.source_chunk,
+                            dep.target_chunk,
+                            dep.dependency_type,
+                            dep.symbol_name,
+                        )
+                    )
+            try:
+                cache.store(file_path, fingerprint, rows)
+            except Exception as e:
+                logger.warning(f"Failed to cache dependencies for {file_path}: {e}")
+
+    def _drop_dependencies_for_files(self, file_paths: Set[str]):
+        """Forget dependencies whose source chunk lives in one of the given files."""
+        self._closure2 = None
+        self._adjacency = None
+        kept = [
+            self._dependency_at(row)
+            for row, source in enumerate(self._src)
+            if source.rsplit(":", 2)[0] not in file_paths
+        ]
+
+        self._src, self._tgt, self._type, self._name = [], [], array("B"), []
+        self._type_counts.clear()
+        self._dep_keys.clear()
+        self._rows_by_source.clear()
+        self._rows_by_target.clear()
+        for dep in kept:
+            self._add_dependency(dep)
+
+    def _add_dependency(self, dep: Dependency) -> bool:
+        """Record a dependency unless an identical one exists. Returns True if added."""
+        key = (dep.source_chunk, dep.target_chunk, dep.symbol_name)
+        if key in self._dep_keys:
+            return False
+
+        row = len(self._src)
+        self._adjacency = None
+        self._dep_keys.add(key)
+        self._src.append(dep.source_chunk)
+        self._tgt.append(dep.target_chunk)
+        type_id = self._type_ids.get(dep.dependency_type)
+        if type_id is None:
+            type_id = self._type_ids[dep.dependency_type] = len(self._type_names)
+            self._type_names.append(dep.dependency_type)
+        self._type.append(type_id)
+        self._name.append(dep.symbol_name)
+        self._type_counts[dep.dependency_type] += 1
+        self._rows_by_source[dep.source_chunk].append(row)
+        self._rows_by_target[dep.target_chunk].append(row)
+        return True
+
     async def _analyze_language(
         self,
         language: str,
         files_dict: Dict[str, List[CodeChunk]],
         chunk_map: Dict[str, CodeChunk],
         abs_repo_path: str,
+        sources: Optional[Dict[str, bytes]] = None,
     ):
         """Analyze files for a specific language using its language server."""
         logger.debug(f"Starting analysis for {language} with {len(files_dict)} files")
@@ -146,22 +661,30 @@ class LSPResolver:
         self.language_servers[language] = language_server
 
         try:
+            # Phase 1: parse files and collect symbol references in worker
+            # processes before the language server is started
+            references_by_file = await self._extract_references(
+                language, files_dict, abs_repo_path, sources
+            )
+
             # Use the async context manager to start the server
             async with language_server.start_server():
-                for file_path, file_chunks in files_dict.items():
+                # Phase 2: resolve references file by file through the language server
+                for file_path, references in references_by_file.items():
                     try:
                         logger.debug(
-                            f"Analyzing {language} file: {file_path} with {len(file_chunks)} chunks"
+                            f"Resolving {len(references)} {language} references in {file_path}"
                         )
-                        for chunk in file_chunks:
-                            try:
-                                await self._analyze_chunk(
-                                    chunk, chunk_map, language, language_server
-                                )
-                            except Exception as chunk_error:
-                                logger.debug(
-                                    f"Failed to analyze chunk {chunk.file_path}:{chunk.start_line}: {chunk_error}"
-                                )
+                        # open_file is a context manager: one didOpen for the
+                        # file's references, didClose once they are resolved
+                        with language_server.open_file(file_path):
+                            await self._resolve_file_references(
+                                file_path,
+                                references,
+                                chunk_map,
+                                language,
+                                language_server,
+                            )
                     except Exception as e:
                         logger.warning(f"Failed to analyze file {file_path}: {e}")
         finally:
@@ -169,435 +692,421 @@ class LSPResolver:
             if language in self.language_servers:
                 del self.language_servers[language]
 
-    async def _analyze_chunk(
+    async def _extract_references(
         self,
-        chunk: CodeChunk,
-        chunk_map: Dict[str, CodeChunk],
         language: str,
-        language_server: LanguageServer,
-    ):
-        """Analyze a single chunk and find its dependencies using Tree-sitter and LSP."""
-        relative_file_path = chunk.file_path
-        logger.debug(
-            f"Analyzing {language} chunk: {chunk.file_path}:{chunk.start_line}-{chunk.end_line}"
-        )
+        files_dict: Dict[str, List[CodeChunk]],
+        abs_repo_path: str,
+        sources: Optional[Dict[str, bytes]] = None,
+    ) -> Dict[str, List[SymbolReference]]:
+        """Run Tree-sitter extraction for every file of a language in the worker pool."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        file_paths = []
+        tasks = []
+        for file_path, file_chunks in files_dict.items():
+            # Files already read while fingerprinting are not read again
+            source = sources.pop(file_path, None) if sources else None
+            if source is None:
+                try:
+                    source = (Path(abs_repo_path) / file_path).read_bytes()
+                except OSError as e:
+                    logger.warning(f"Failed to read file {file_path}: {e}")
+                    continue
 
-        # Open the file in the language server
-        try:
-            language_server.open_file(relative_file_path)
-        except Exception as e:
-            logger.debug(f"Failed to open file {relative_file_path}: {e}")
-            return
+            spans = [
+                (chunk.chunk_id, chunk.start_line, chunk.end_line)
+                for chunk in file_chunks
+            ]
+            file_paths.append(file_path)
+            tasks.append(
+                loop.run_in_executor(
+                    executor, extract_file_references, language, source, spans
+                )
+            )
 
-        # Parse the chunk content with Tree-sitter
-        parser = self._get_parser(language)
-        if not parser:
-            logger.debug(f"No parser available for {language}")
-            return
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        references_by_file: Dict[str, List[SymbolReference]] = {}
+        for file_path, result in zip(file_paths, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to parse file {file_path}: {result}")
+                continue
+            references_by_file[file_path] = result
+        return references_by_file
+
+    def _get_executor(self) -> Executor:
+        """Get the worker pool, creating it with one worker per core."""
+        if self._executor is None:
+            workers = os.cpu_count() or 1
+            if self.use_process_pool:
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="tree-sitter"
+                )
+        return self._executor
 
-        try:
-            tree = parser.parse(bytes(chunk.content, "utf8"))
-            await self._analyze_ast_nodes(
-                tree.root_node,
-                chunk,
-                chunk_map,
-                relative_file_path,
-                language,
-                language_server,
-            )
-        except Exception as e:
-            logger.debug(f"Failed to parse chunk with Tree-sitter: {e}")
-            return
+    def close(self):
+        """Shut down the worker pool and close the dependency cache."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._dep_cache is not None:
+            self._dep_cache.close()
+            self._dep_cache = None
 
-    async def _analyze_ast_nodes(
-        self,
-        node: Node,
-        chunk: CodeChunk,
-        chunk_map: Dict[str, CodeChunk],
-        relative_file_path: str,
-        language: str,
-        language_server: LanguageServer,
-    ):
-        """Analyze AST nodes to find dependencies using Tree-sitter."""
-        # Get dependency node types from language config
-        config = self.registry.get_config(language)
-        if not config:
-            logger.debug(f"No config available for language: {language}")
-            return
+    async def __aenter__(self):
+        return self
 
-        # Collect all node types that might indicate dependencies
-        target_types = set()
-        for node_type_list in config.node_types.values():
-            target_types.update(node_type_list)
-
-        # Add common dependency-related node types
-        common_dependency_types = {
-            "import_statement",
-            "import_from_statement",
-            "call",
-            "call_expression",
-            "attribute",
-            "member_expression",
-            "identifier",
-            "new_expression",
-        }
-        target_types.update(common_dependency_types)
-
-        # Recursively traverse the AST
-        await self._traverse_node(
-            node,
-            chunk,
-            chunk_map,
-            relative_file_path,
-            language,
-            language_server,
-            target_types,
-        )
+    async def __aexit__(self, *args):
+        self.close()
 
-    async def _traverse_node(
+    async def _resolve_file_references(
         self,
-        node: Node,
-        chunk: CodeChunk,
+        file_path: str,
+        references: List[SymbolReference],
         chunk_map: Dict[str, CodeChunk],
-        relative_file_path: str,
         language: str,
         language_server: LanguageServer,
-        target_types: set,
     ):
-        """Recursively traverse AST nodes and extract dependencies."""
-        if node.type in target_types:
-            await self._process_node_by_type(
-                node, chunk, chunk_map, relative_file_path, language, language_server
-            )
+        """Resolve a file's symbol references, one LSP request per unique position."""
+        # Nested chunks and repeated visits hit the same position more than once
+        by_position: Dict[Tuple[int, int], List[SymbolReference]] = {}
+        builtin_names = self._builtin_skip.get(language, frozenset())
+        static_imports = language in STATIC_IMPORT_LANGUAGES
+        for reference in references:
+            # Imports are resolved against the repo's files without the server
+            if static_imports and reference.dependency_type == "imports":
+                self._add_import_dependency(reference, file_path, chunk_map, language)
+                continue
+
+            # Skip short names, numbers and builtins that cannot resolve to a chunk
+            symbol_name = reference.symbol_name
+            if (
+                len(symbol_name) <= 2
+                or symbol_name.isdigit()
+                or symbol_name in builtin_names
+            ):
+                continue
+            position = (reference.line, reference.character)
+            by_position.setdefault(position, []).append(reference)
+
+        semaphore = asyncio.Semaphore(self.max_inflight_definitions)
+
+        async def resolve(position: Tuple[int, int]) -> List[Tuple[str, int]]:
+            async with semaphore:
+                return await self._request_definitions(
+                    language_server, file_path, position[0], position[1]
+                )
 
-        # Recursively process child nodes
-        for child in node.children:
-            await self._traverse_node(
-                child,
-                chunk,
-                chunk_map,
-                relative_file_path,
-                language,
-                language_server,
-                target_types,
-            )
+        # A bare identifier used repeatedly in the same chunk refers to the same
+        # binding, so only its first occurrence is sent to the server
+        shared: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        first_by_scope: Dict[Tuple[str, Tuple[str, ...]], Tuple[int, int]] = {}
+        for position, position_refs in by_position.items():
+            if all(ref.node_type == "identifier" for ref in position_refs):
+                scope = (
+                    position_refs[0].symbol_name,
+                    tuple(sorted(ref.chunk_id for ref in position_refs)),
+                )
+                first = first_by_scope.setdefault(scope, position)
+                if first != position:
+                    shared[position] = first
+
+        # Cached positions are served synchronously without creating coroutines
+        file_cache = self._def_cache.get(file_path, {})
+        resolved = {}
+        pending = []
+        for position in by_position:
+            if position in shared:
+                continue
+            if position in file_cache:
+                resolved[position] = file_cache[position]
+            else:
+                pending.append(position)
+        results = await asyncio.gather(*(resolve(position) for position in pending))
+        resolved.update(zip(pending, results))
+        for position, first in shared.items():
+            resolved[position] = resolved.get(first, [])
+
+        for position, locations in resolved.items():
+            if not locations:
+                continue
+            for reference in by_position[position]:
+                source_chunk = chunk_map.get(reference.chunk_id)
+                if source_chunk is None:
+                    continue
+                self._add_dependencies_for_locations(
+                    source_chunk,
+                    reference.symbol_name,
+                    locations,
+                    reference.dependency_type,
+                    language,
+                )
 
-    async def _process_node_by_type(
+    async def _request_definitions(
         self,
-        node: Node,
-        chunk: CodeChunk,
-        chunk_map: Dict[str, CodeChunk],
-        relative_file_path: str,
-        language: str,
         language_server: LanguageServer,
-    ):
-        """Process specific node types to extract dependencies."""
-        node_type = node.type
-
-        # Get the symbol name from the node
-        symbol_name = self._extract_symbol_name(node, language)
-        if not symbol_name:
-            return
-
-        # Calculate line and character position (LSP uses 0-based indexing)
-        line_num = (chunk.start_line - 1) + node.start_point[0]
-        char_pos = node.start_point[1]
-
-        # Determine dependency type based on node type
-        dependency_type = self._get_dependency_type_from_node(node_type, language)
-
-        if dependency_type:
-            await self._find_and_add_dependency(
-                chunk,
-                symbol_name,
-                line_num,
-                char_pos,
-                chunk_map,
-                dependency_type,
-                relative_file_path,
-                language,
-                language_server,
-            )
+        file_path: str,
+        line_num: int,
+        char_pos: int,
+    ) -> List[Tuple[str, int]]:
+        """Ask the language server for definitions, cached by position."""
+        file_cache = self._def_cache.setdefault(file_path, {})
+        locations = file_cache.get((line_num, char_pos))
+        if locations is not None:
+            return locations
 
-    def _extract_symbol_name(self, node: Node, language: str) -> Optional[str]:
-        """Extract symbol name from AST node using generic patterns."""
         try:
-            # Generic identifier extraction - works for most languages
-            if node.type == "identifier":
-                return node.text.decode("utf8")
-
-            # Import/require statements - look for string literals or identifiers
-            if "import" in node.type or "require" in node.type or "use" in node.type:
-                for child in node.children:
-                    if child.type in ["string", "string_literal"]:
-                        return (
-                            child.text.decode("utf8").strip("\"'")
-                            if child.text
-                            else None
-                        )
-                    elif child.type in [
-                        "dotted_name",
-                        "identifier",
-                        "scoped_identifier",
-                    ]:
-                        return child.text.decode("utf8") if child.text else None
-
-            # Function/method calls - extract the callable name
-            if "call" in node.type:
-                if node.children:
-                    first_child = node.children[0]
-                    if first_child.type == "identifier":
-                        return (
-                            first_child.text.decode("utf8")
-                            if first_child.text
-                            else None
-                        )
-                    elif hasattr(first_child, "children") and first_child.children:
-                        # Handle member access like obj.method()
-                        return (
-                            first_child.children[-1].text.decode("utf8")
-                            if first_child.children
-                            else None
-                        )
-
-            # Member/attribute access - get the property name
-            if node.type in ["attribute", "member_expression", "field_expression"]:
-                if len(node.children) >= 2:
-                    # Usually the last child is the member name
-                    return node.children[-1].text.decode("utf8")
-
-            # New expressions - get the type being instantiated
-            if "new" in node.type and node.children:
-                return node.children[0].text.decode("utf8")
+            definitions = await language_server.request_definition(
+                file_path, line_num, char_pos
+            )
+        except Exception as e:
+            # Log debug info for failed lookups, but don't fail the analysis
+            logger.debug(
+                f"Failed to find definition at {file_path}:{line_num}:{char_pos}: {e}"
+            )
+            return []
+
+        locations = []
+        for definition in definitions:
+            # Handle different response formats from LSP
+            if hasattr(definition, "uri"):
+                # Location object format
+                uri = definition.uri
+                line = definition.range.start.line
+            elif isinstance(definition, dict):
+                # Dictionary format
+                uri = definition.get("uri")
+                range_info = definition.get("range", {})
+                start_info = range_info.get("start", {})
+                line = start_info.get("line", 0)
+
+                # multilspy already resolves the repo-relative path
+                relative_path = definition.get("relativePath")
+                if relative_path:
+                    locations.append((sys.intern(relative_path), line))
+                    continue
+            else:
+                logger.debug(f"Unknown definition format: {type(definition)}")
+                continue
 
-            # For other node types, try to extract the first meaningful identifier
-            for child in node.children:
-                if child.type == "identifier":
-                    return child.text.decode("utf8")
+            if not uri:
+                logger.debug(f"No URI in definition: {definition}")
+                continue
 
-        except Exception as e:
-            logger.debug(f"Failed to extract symbol name from {node.type}: {e}")
+            locations.append((self._uri_to_relative_path(uri), line))
 
-        return None
+        file_cache[(line_num, char_pos)] = locations
+        return locations
 
-    def _get_dependency_type_from_node(
-        self, node_type: str, language: str
-    ) -> Optional[str]:
-        """Map AST node types to dependency types."""
-        # Generic mapping that works across languages
-        if "import" in node_type:
-            return "imports"
-        elif "call" in node_type:
-            return "calls"
-        elif "new" in node_type:
-            return "instantiates"
-        elif node_type in ["attribute", "member_expression"]:
-            return "uses"
-        elif node_type == "identifier":
-            return "uses"
-        else:
-            return "uses"
-
-    async def _process_document_symbols(
-        self, symbols: list, chunk: CodeChunk, chunk_map: Dict[str, CodeChunk]
-    ):
-        """Process document symbols to find structural dependencies."""
-        for symbol in symbols:
-            if symbol.get("children"):
-                await self._process_document_symbols(
-                    symbol["children"], chunk, chunk_map
-                )
+    def _invalidate_definitions(self, file_paths: Optional[Set[str]]):
+        """Forget cached definitions in or pointing into the given files (None = all)."""
+        if file_paths is None:
+            self._def_cache.clear()
+            return
 
-    async def _find_and_add_dependency(
+        for file_path in file_paths:
+            self._def_cache.pop(file_path, None)
+        for file_cache in self._def_cache.values():
+            stale = [
+                position
+                for position, locations in file_cache.items()
+                if any(path in file_paths for path, _ in locations)
+            ]
+            for position in stale:
+                del file_cache[position]
+
+    def _add_dependencies_for_locations(
         self,
         source_chunk: CodeChunk,
         symbol_name: str,
-        line_num: int,
-        char_pos: int,
-        chunk_map: Dict[str, CodeChunk],
+        locations: List[Tuple[str, int]],
         dependency_type: str,
-        relative_file_path: str,
         language: str,
-        language_server: LanguageServer,
     ):
-        """Find the definition of a symbol and add it as a dependency."""
-        # Skip common keywords and built-ins (Tree-sitter handles this better than manual lists)
-        if len(symbol_name) <= 2 or symbol_name.isdigit():
-            return
-
-        source_chunk_id = f"{source_chunk.file_path}:{source_chunk.start_line}:{source_chunk.end_line}"
+        """Add a dependency from the source chunk to each chunk holding a definition."""
+        # Chunk ids are interned; names repeat across many edges too
+        source_chunk_id = source_chunk.chunk_id
+        symbol_name = sys.intern(symbol_name)
 
-        try:
-            # Try to get definition using LSP
-            definitions = await language_server.request_definition(
-                relative_file_path, line_num, char_pos
-            )
+        for file_path, line in locations:
+            target_chunk = self._find_chunk_for_location(file_path, line)
 
-            for definition in definitions:
-                # Handle different response formats from LSP
-                if hasattr(definition, "uri"):
-                    # Location object format
-                    uri = definition.uri
-                    line = definition.range.start.line
-                elif isinstance(definition, dict):
-                    # Dictionary format
-                    uri = definition.get("uri")
-                    range_info = definition.get("range", {})
-                    start_info = range_info.get("start", {})
-                    line = start_info.get("line", 0)
-                else:
-                    logger.debug(f"Unknown definition format: {type(definition)}")
-                    continue
+            if target_chunk:
+                target_chunk_id = target_chunk.chunk_id
 
-                if not uri:
-                    logger.debug(f"No URI in definition: {definition}")
+                # Avoid self-dependencies
+                if source_chunk_id is target_chunk_id:
                     continue
 
-                target_chunk = self._find_chunk_for_location(uri, line, chunk_map)
-
-                if target_chunk:
-                    target_chunk_id = f"{target_chunk.file_path}:{target_chunk.start_line}:{target_chunk.end_line}"
-
-                    # Avoid self-dependencies
-                    if source_chunk_id == target_chunk_id:
-                        continue
+                # Refine dependency type based on target chunk type
+                refined_type = self._refine_dependency_type(
+                    dependency_type, target_chunk
+                )
 
-                    # Refine dependency type based on target chunk type
-                    refined_type = self._refine_dependency_type(
-                        dependency_type, target_chunk
-                    )
+                dep = Dependency(
+                    source_chunk=source_chunk_id,
+                    target_chunk=target_chunk_id,
+                    dependency_type=refined_type,
+                    symbol_name=symbol_name,
+                )
 
-                    dep = Dependency(
-                        source_chunk=source_chunk_id,
-                        target_chunk=target_chunk_id,
-                        dependency_type=refined_type,
-                        symbol_name=symbol_name,
+                if self._add_dependency(dep):
+                    logger.debug(
+                        f"Added {language} dependency: {source_chunk.file_path}:{source_chunk.start_line} {refined_type} {target_chunk.file_path}:{target_chunk.start_line} ({symbol_name})"
                     )
 
-                    # Check if dependency already exists
-                    if not any(
-                        existing.source_chunk == dep.source_chunk
-                        and existing.target_chunk == dep.target_chunk
-                        and existing.symbol_name == dep.symbol_name
-                        for existing in self.dependencies
-                    ):
-                        self.dependencies.append(dep)
-                        logger.debug(
-                            f"Added {language} dependency: {source_chunk.file_path}:{source_chunk.start_line} {refined_type} {target_chunk.file_path}:{target_chunk.start_line} ({symbol_name})"
-                        )
-
-        except Exception as e:
-            # Log debug info for failed lookups, but don't fail the analysis
-            logger.debug(
-                f"Failed to find definition for {symbol_name} at {source_chunk.file_path}:{line_num}:{char_pos}: {e}"
-            )
-
     def _refine_dependency_type(self, base_type: str, target_chunk: CodeChunk) -> str:
         """Refine the dependency type based on the target chunk type."""
-        if base_type == "calls" and target_chunk.chunk_type in [
-            "function_definition",
-            "method_definition",
-        ]:
-            return "calls"
-        elif (
-            base_type == "instantiates"
-            and target_chunk.chunk_type == "class_definition"
-        ):
-            return "instantiates"
-        elif base_type == "inherits" and target_chunk.chunk_type == "class_definition":
-            return "inherits"
-        elif base_type == "imports":
-            return "imports"
-        else:
-            return "uses"
+        refined = REFINED_DEPENDENCY_TYPES.get((base_type, target_chunk.chunk_type))
+        if refined is not None:
+            return refined
+        return "imports" if base_type == "imports" else "uses"
 
     def get_dependencies_for_chunk(self, chunk_id: str) -> List[Dependency]:
         """Get all dependencies for a specific chunk."""
-        return [dep for dep in self.dependencies if dep.source_chunk == chunk_id]
+        return [
+            self._dependency_at(row) for row in self._rows_by_source.get(chunk_id, [])
+        ]
 
     def get_dependents_for_chunk(self, chunk_id: str) -> List[Dependency]:
         """Get all chunks that depend on a specific chunk."""
-        return [dep for dep in self.dependencies if dep.target_chunk == chunk_id]
+        return [
+            self._dependency_at(row) for row in self._rows_by_target.get(chunk_id, [])
+        ]
 
     def get_dependency_graph_stats(self) -> Dict[str, int]:
         """Get statistics about the dependency graph."""
+        counts = self._type_counts
         stats = {
-            "total_dependencies": len(self.dependencies),
-            "calls": len(
-                [d for d in self.dependencies if d.dependency_type == "calls"]
-            ),
-            "imports": len(
-                [d for d in self.dependencies if d.dependency_type == "imports"]
-            ),
-            "inherits": len(
-                [d for d in self.dependencies if d.dependency_type == "inherits"]
-            ),
-            "instantiates": len(
-                [d for d in self.dependencies if d.dependency_type == "instantiates"]
-            ),
-            "uses": len([d for d in self.dependencies if d.dependency_type == "uses"]),
+            "total_dependencies": len(self._src),
+            "calls": counts["calls"],
+            "imports": counts["imports"],
+            "inherits": counts["inherits"],
+            "instantiates": counts["instantiates"],
+            "uses": counts["uses"],
         }
         return stats
 
     def _build_adjacency_list(self) -> Dict[str, List[str]]:
-        """Build an adjacency list representation of the dependency graph."""
-        graph = {}
-        for dep in self.dependencies:
-            if dep.source_chunk not in graph:
-                graph[dep.source_chunk] = []
-            if dep.target_chunk not in graph[dep.source_chunk]:
-                graph[dep.source_chunk].append(dep.target_chunk)
-        return graph
+        """
+        Build an adjacency list representation of the dependency graph.
+
+        The result is cached until the dependencies change and shared between
+        callers, so it must not be modified.
+        """
+        if self._adjacency is not None:
+            return self._adjacency
+
+        # Ordered dicts as insertion-ordered sets: O(1) dedup, stable neighbor order
+        neighbors: Dict[str, Dict[str, None]] = {}
+        for source, target in zip(self._src, self._tgt):
+            neighbors.setdefault(source, {})[target] = None
+        self._adjacency = {
+            source: list(targets) for source, targets in neighbors.items()
+        }
+        return self._adjacency
+
+    def _build_closure2(self):
+        """Precompute the chunks reachable within two hops from every chunk."""
+        graph = self._build_adjacency_list()
+        closure = {}
+        for node, neighbors in graph.items():
+            reachable = set(neighbors)
+            for neighbor in neighbors:
+                reachable.update(graph.get(neighbor, ()))
+            closure[node] = frozenset(reachable)
+        self._closure2 = closure
+
+    def find_related_chunks(self, chunk_ids: List[str], max_depth: int = 2) -> Set[str]:
+        """
+        Find chunks reachable from the given chunks by following dependencies.
+
+        Args:
+            chunk_ids: Starting chunk IDs
+            max_depth: Maximum number of dependency hops to follow
+
+        Returns:
+            The starting chunk IDs plus every chunk reachable within max_depth hops
+        """
+        related = set(chunk_ids)
+
+        # Fast path: the default depth is answered from the precomputed closure
+        if max_depth == 2 and self._closure2 is not None:
+            for chunk_id in chunk_ids:
+                related |= self._closure2.get(chunk_id, frozenset())
+            return related
+
+        graph = self._build_adjacency_list()
+        frontier = set(chunk_ids)
+        for _ in range(max_depth):
+            next_frontier = set()
+            for chunk_id in frontier:
+                for neighbor in graph.get(chunk_id, []):
+                    if neighbor not in related:
+                        related.add(neighbor)
+                        next_frontier.add(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        return related
 
     def detect_cycles(self) -> List[List[str]]:
         """
         Detect all cycles in the dependency graph using DFS with recursion stack.
         Returns a list of cycles, where each cycle is a list of chunk IDs.
+
+        The DFS keeps an explicit stack of neighbor iterators, so deep
+        dependency chains cannot hit the interpreter's recursion limit.
         """
         visited = set()
-        rec_stack = set()
         cycles = []
+        seen_cycles: Set[frozenset] = set()
 
         # Build adjacency list from dependencies
         graph = self._build_adjacency_list()
 
-        def dfs(node: str, path: List[str]):
-            """Depth-first search to detect cycles."""
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
+        # Start DFS from each unvisited node
+        for root in graph:
+            if root in visited:
+                continue
+
+            visited.add(root)
+            path = [root]
+            # Position of each node on the current path (the recursion stack)
+            on_path = {root: 0}
+            stack = [iter(graph.get(root, ()))]
+
+            while stack:
+                neighbor = next(stack[-1], None)
+                if neighbor is None:
+                    # All neighbors explored; backtrack
+                    stack.pop()
+                    del on_path[path.pop()]
+                    continue
 
-            # Explore all neighbors
-            for neighbor in graph.get(node, []):
                 if neighbor not in visited:
-                    # Recursively visit unvisited neighbors
-                    dfs(neighbor, path[:])
-                elif neighbor in rec_stack:
+                    visited.add(neighbor)
+                    on_path[neighbor] = len(path)
+                    path.append(neighbor)
+                    stack.append(iter(graph.get(neighbor, ())))
+                elif neighbor in on_path:
                     # Found a cycle - extract it from the path
-                    cycle_start = path.index(neighbor)
-                    cycle = path[cycle_start:] + [neighbor]
-
-                    # Avoid duplicate cycles by checking if this exact cycle exists
-                    cycle_set = set(cycle)
-                    is_duplicate = False
-                    for existing_cycle in cycles:
-                        if set(existing_cycle) == cycle_set:
-                            is_duplicate = True
-                            break
-
-                    if not is_duplicate:
+                    cycle = path[on_path[neighbor] :] + [neighbor]
+
+                    # Avoid duplicate cycles over the same set of chunks
+                    cycle_key = frozenset(cycle)
+                    if cycle_key not in seen_cycles:
+                        seen_cycles.add(cycle_key)
                         cycles.append(cycle)
                         logger.warning(
                             f"Circular dependency detected: {' -> '.join(cycle)}"
                         )
 
-            rec_stack.remove(node)
-
-        # Start DFS from each unvisited node
-        for node in graph:
-            if node not in visited:
-                dfs(node, [])
-
         return cycles
 
     def get_cycle_analysis(self) -> Dict[str, any]:
@@ -638,28 +1147,131 @@ class LSPResolver:
             "affected_chunk_count": len(affected_chunks),
         }
 
+    def _uri_to_relative_path(self, file_uri: str) -> str:
+        """Convert a file URI from the language server to a repo-relative path."""
+        return _uri_to_relative_path(file_uri, self._repo_root_str)
+
+    def _index_chunks_by_file(self, chunks: List[CodeChunk]):
+        """Index chunks per file, sorted by start line, for location lookups."""
+        grouped: Dict[str, List[CodeChunk]] = {}
+        for chunk in chunks:
+            grouped.setdefault(sys.intern(chunk.file_path), []).append(chunk)
+
+        index = {}
+        for file_path, file_chunks in grouped.items():
+            file_chunks.sort(key=lambda chunk: chunk.start_line)
+            starts = [chunk.start_line for chunk in file_chunks]
+            # Running maximum of end lines lets the backward scan stop early
+            max_ends = []
+            max_end = 0
+            for chunk in file_chunks:
+                max_end = max(max_end, chunk.end_line)
+                max_ends.append(max_end)
+            index[file_path] = (starts, max_ends, file_chunks)
+        self._chunks_by_file = index
+        self._python_modules = self._build_python_module_index(index)
+
+    def _build_python_module_index(
+        self, chunks_by_file: Dict[str, Tuple[List[int], List[int], List[CodeChunk]]]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Map dotted module names to Python files.
+
+        Every dotted suffix of a file's path is indexed so imports resolve
+        regardless of the source root; suffixes shared by several files map
+        to None.
+        """
+        modules: Dict[str, Optional[str]] = {}
+        for file_path in chunks_by_file:
+            if not file_path.endswith(".py"):
+                continue
+            parts = file_path[: -len(".py")].split("/")
+            if parts[-1] == "__init__":
+                parts.pop()
+            for i in range(len(parts)):
+                name = ".".join(parts[i:])
+                if not name:
+                    continue
+                modules[name] = None if name in modules else file_path
+        return modules
+
+    def _resolve_import(
+        self, module: str, file_path: str, language: str
+    ) -> Optional[str]:
+        """Resolve an imported module name to a file in the repository."""
+        if language == "python":
+            if not module.startswith("."):
+                return self._python_modules.get(module)
+
+            # Relative import: one leading dot per package level
+            level = len(module) - len(module.lstrip("."))
+            base = posixpath.dirname(file_path)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            rest = module[level:].replace(".", "/")
+            target = posixpath.join(base, rest) if rest else base
+            for candidate in (f"{target}.py", posixpath.join(target, "__init__.py")):
+                candidate = candidate.lstrip("/")
+                if candidate in self._chunks_by_file:
+                    return candidate
+            return None
+
+        # JavaScript/TypeScript: only relative specifiers point into the repo
+        if not module.startswith("."):
+            return None
+        target = posixpath.normpath(
+            posixpath.join(posixpath.dirname(file_path), module)
+        )
+        if target in self._chunks_by_file:
+            return target
+        for extension in JS_MODULE_EXTENSIONS:
+            for candidate in (f"{target}{extension}", f"{target}/index{extension}"):
+                if candidate in self._chunks_by_file:
+                    return candidate
+        return None
+
+    def _add_import_dependency(
+        self,
+        reference: SymbolReference,
+        file_path: str,
+        chunk_map: Dict[str, CodeChunk],
+        language: str,
+    ):
+        """Add an import edge from the importing chunk to the module's first chunk."""
+        source_chunk = chunk_map.get(reference.chunk_id)
+        if source_chunk is None:
+            return
+
+        target_path = self._resolve_import(reference.symbol_name, file_path, language)
+        if target_path is None or target_path == file_path:
+            return
+
+        first_chunk = self._chunks_by_file[target_path][2][0]
+        self._add_dependencies_for_locations(
+            source_chunk,
+            reference.symbol_name,
+            [(target_path, first_chunk.start_line - 1)],
+            "imports",
+            language,
+        )
+
     def _find_chunk_for_location(
-        self, file_uri: str, line: int, chunk_map: Dict[str, CodeChunk]
+        self, file_path: str, line: int
     ) -> Optional[CodeChunk]:
-        """Find the chunk that contains the given location."""
-        # multilspy returns file URIs, convert back to relative path
-        if file_uri.startswith("file://"):
-            file_path = Path(file_uri.replace("file://", "")).as_posix()
-            # Make it relative to the repo root
-            repo_root = Path(self.repo_path).resolve()
-            try:
-                file_path = str(Path(file_path).relative_to(repo_root))
-            except ValueError:
-                # If not relative to repo root, use as-is
-                pass
-        else:
-            file_path = file_uri
+        """Find the innermost chunk that contains the given location."""
+        entry = self._chunks_by_file.get(file_path)
+        if entry is None:
+            return None
+        starts, max_ends, file_chunks = entry
 
         # Convert LSP 0-based line to 1-based line for chunk comparison
         line_1_based = line + 1
 
-        for chunk_id, chunk in chunk_map.items():
-            if chunk.file_path == file_path:
-                if chunk.start_line <= line_1_based <= chunk.end_line:
-                    return chunk
+        # Walk back from the last chunk starting at or before the line; the
+        # first one that still covers it is the innermost containing chunk
+        i = bisect_right(starts, line_1_based) - 1
+        while i >= 0 and max_ends[i] >= line_1_based:
+            if file_chunks[i].end_line >= line_1_based:
+                return file_chunks[i]
+            i -= 1
         return None
@@ -1,12 +1,31 @@
-from typing import List
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from dataclasses import dataclass
-from storage.vector_store import VectorSearchResult
-from inference.openai_client import LLMClient
+from functools import lru_cache
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing them pulls in the Qdrant and
+    # OpenAI clients for every module that just wants RerankedResult
+    from storage.vector_store import VectorSearchResult
+    from inference.openai_client import LLMClient
+
+
+# Recent rankings keyed by sha256 of the query, candidate chunks and top_k, as
+# (document index, score, rank) tuples; reruns over the same candidates reuse them
+RANKING_CACHE_SIZE = 1024
+_rankings: "OrderedDict[bytes, Tuple[Tuple[int, float, int], ...]]" = OrderedDict()
+
+
+@lru_cache(maxsize=4096)
+def _format_document(chunk_type: str, name: str, file_path: str, content: str) -> str:
+    """Build the rerank document text for a chunk, memoized across queries."""
+    return f"{chunk_type} {name} in {file_path}:\n{content}"
 
 
 @dataclass
 class RerankedResult:
-    result: VectorSearchResult
+    result: "VectorSearchResult"
     score: float
     rank: int
 
@@ -14,34 +33,38 @@ class RerankedResult:
 class CodeReranker:
     """Rerank code chunks for relevance."""
 
-    def __init__(self, client: LLMClient):
+    def __init__(self, client: "LLMClient"):
         self.client = client
 
     async def rerank_search_results(
         self,
         query: str,
-        search_results: List[VectorSearchResult],
+        search_results: List["VectorSearchResult"],
         top_k: int = 5,
     ) -> List[RerankedResult]:
         """Rerank search results by relevance."""
         if not search_results:
             return []
 
-        # Prepare documents
-        documents = []
-        result_list = []
-
-        for result in search_results:
-            if result.content:
-                doc_text = self._format_chunk(result)
-                documents.append(doc_text)
-                result_list.append(result)
-
+        documents, result_list = self._prepare_documents(search_results)
         if not documents:
             return []
 
+        # Every result would be kept anyway, so skip the model call
+        if len(result_list) <= top_k:
+            return self._in_search_order(result_list)
+
+        key = _rankings_key(query, result_list, top_k)
+        cached = _cached_rankings(key)
+        if cached is not None:
+            return [
+                RerankedResult(result=result_list[index], score=score, rank=rank)
+                for index, score, rank in cached
+            ]
+
         # Rerank
         rankings = await self.client.rerank(query, documents, top_k)
+        _remember_rankings(key, rankings)
 
         # Convert to results
         results = []
@@ -59,10 +82,66 @@ class CodeReranker:
 
         return results
 
-    def _format_chunk(self, result: VectorSearchResult) -> str:
+    def _in_search_order(
+        self, result_list: List["VectorSearchResult"]
+    ) -> List[RerankedResult]:
+        """Rank results by their vector search score without reranking."""
+        ordered = sorted(result_list, key=lambda result: result.score, reverse=True)
+        return [
+            RerankedResult(result=result, score=result.score, rank=rank)
+            for rank, result in enumerate(ordered, 1)
+        ]
+
+    def _prepare_documents(
+        self, search_results: List["VectorSearchResult"]
+    ) -> Tuple[List[str], List["VectorSearchResult"]]:
+        """Format unique, non-empty results as rerank documents."""
+        documents = []
+        result_list = []
+        seen_hashes = set()
+
+        for result in search_results:
+            # Results arrive best-score first, so the first copy of a chunk wins
+            if result.content and result.content_hash not in seen_hashes:
+                seen_hashes.add(result.content_hash)
+                doc_text = self._format_chunk(result)
+                documents.append(doc_text)
+                result_list.append(result)
+
+        return documents, result_list
+
+    def _format_chunk(self, result: "VectorSearchResult") -> str:
         """Format chunk for reranking."""
         metadata = result.metadata
         chunk_type = metadata.get("chunk_type", "code")
         name = metadata.get("name", "")
         file_path = metadata.get("file_path", "")
-        return f"{chunk_type} {name} in {file_path}:\n{result.content}"
+        return _format_document(chunk_type, name, file_path, result.content)
+
+
+def _rankings_key(
+    query: str, result_list: List["VectorSearchResult"], top_k: int
+) -> bytes:
+    """Key a rerank request by its query, candidates in order, and top_k."""
+    digest = hashlib.sha256(f"{top_k}\0{query}".encode())
+    for result in result_list:
+        digest.update(b"\0" + result.content_hash.encode())
+    return digest.digest()
+
+
+def _cached_rankings(key: bytes) -> Optional[Tuple[Tuple[int, float, int], ...]]:
+    """Return the remembered rankings for a rerank request, if any."""
+    rankings = _rankings.get(key)
+    if rankings is not None:
+        _rankings.move_to_end(key)
+    return rankings
+
+
+def _remember_rankings(key: bytes, rankings: List[dict]):
+    """Remember a rerank response, evicting the least recently used one."""
+    _rankings[key] = tuple(
+        (ranking["index"], ranking["score"], ranking["rank"]) for ranking in rankings
+    )
+    if len(_rankings) > RANKING_CACHE_SIZE:
+        _rankings.popitem(last=False)
+
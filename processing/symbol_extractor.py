@@ -0,0 +1,585 @@
+"""
+Tree-sitter symbol extraction for dependency analysis.
+
+This is the CPU-bound half of LSPResolver: it parses a file and collects the
+symbol references that should be resolved through the language server. It
+only deals in plain data so it can run inside worker processes, and is safe
+to share between threads since Tree-sitter releases the GIL while parsing.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from tree_sitter import Node, Parser, Query, Tree
+
+try:
+    # tree-sitter 0.25 moved query execution from Query to QueryCursor
+    from tree_sitter import QueryCursor
+except ImportError:
+    QueryCursor = None
+
+from core.language_registry import get_language_registry
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Maximum number of parsed Tree-sitter trees kept in the LRU cache
+TREE_CACHE_SIZE = 512
+
+# Per-thread parser pool; Tree-sitter parsers must not be shared across threads
+_parser_pool = threading.local()
+
+# Common dependency-related node types shared by most grammars
+COMMON_DEPENDENCY_TYPES = frozenset(
+    {
+        "import_statement",
+        "import_from_statement",
+        "call",
+        "call_expression",
+        "attribute",
+        "member_expression",
+        "identifier",
+        "new_expression",
+    }
+)
+
+# Leaf-like node types that never contain references; any grammar node type
+# containing "comment" is pruned as well. Whole "string" nodes are kept since
+# interpolations (f-strings, template literals) hold real identifiers.
+PRUNE_NODE_TYPES = frozenset(
+    {
+        "string_content",
+        "string_fragment",
+        "escape_sequence",
+        "regex",
+        "regex_pattern",
+    }
+)
+
+# Child node types that name the imported module
+STRING_NODE_TYPES = frozenset({"string", "string_literal"})
+IMPORT_NAME_NODE_TYPES = frozenset(
+    {"dotted_name", "relative_import", "identifier", "scoped_identifier"}
+)
+
+# Member/attribute access nodes whose last child is the member name
+MEMBER_NODE_TYPES = frozenset({"attribute", "member_expression", "field_expression"})
+
+# Pulls a symbol name out of a node, or None if the pattern does not apply
+NameExtractor = Callable[[Node, "SourceText"], Optional[str]]
+
+# Dependency type per node type for the common grammars; other node types are
+# classified by _classify_node_type on first sight and memoized
+NODE_TYPE_TO_DEP = {
+    "import_statement": "imports",
+    "import_from_statement": "imports",
+    "import_declaration": "imports",
+    "import_spec": "imports",
+    "import_header": "imports",
+    "import_specification": "imports",
+    "call": "calls",
+    "call_expression": "calls",
+    "new_expression": "instantiates",
+    "attribute": "uses",
+    "member_expression": "uses",
+    "field_expression": "uses",
+    "identifier": "uses",
+}
+
+
+@dataclass
+class SymbolReference:
+    """A symbol occurrence inside a chunk that may point at another chunk."""
+
+    chunk_id: str
+    symbol_name: str
+    line: int  # 0-based, absolute within the file
+    character: int
+    dependency_type: str
+    node_type: str
+
+
+class SourceText:
+    """Decode node text by slicing one file buffer, memoized per byte range."""
+
+    def __init__(self, source: bytes):
+        self.source = source
+        self._decoded: Dict[Tuple[int, int], str] = {}
+
+    def __call__(self, node: Node) -> str:
+        key = (node.start_byte, node.end_byte)
+        value = self._decoded.get(key)
+        if value is None:
+            raw = self.source[key[0] : key[1]]
+            try:
+                # Most identifiers are ASCII, which decodes on the fast path
+                value = raw.decode("ascii")
+            except UnicodeDecodeError:
+                value = raw.decode("utf8", errors="replace")
+            self._decoded[key] = value
+        return value
+
+
+class SymbolExtractor:
+    """Parse files with Tree-sitter and collect candidate symbol references."""
+
+    def __init__(self):
+        self.registry = get_language_registry()
+        # LRU cache of parsed trees keyed by (language, content digest)
+        self._tree_cache: "OrderedDict[Tuple[str, bytes], Tree]" = OrderedDict()
+        self._tree_cache_lock = threading.Lock()
+        # Candidate node types per language, built once on first use
+        self._target_types_by_lang: Dict[str, FrozenSet[str]] = {}
+        # Node type -> dependency type, extended as new node types are seen
+        self._dependency_types: Dict[str, str] = dict(NODE_TYPE_TO_DEP)
+        # Node types whose subtrees the walk skips, per language
+        self._prune_types_by_lang: Dict[str, FrozenSet[str]] = {}
+        # Compiled candidate queries per language (None if the grammar has none)
+        self._queries: Dict[str, Optional[Query]] = {}
+        # Name extraction patterns per node type, selected on first sight
+        self._name_extractors: Dict[str, Tuple[NameExtractor, ...]] = {}
+
+    def get_parser(self, language: str) -> Optional[Parser]:
+        """Get this thread's Tree-sitter parser for a language, creating it once."""
+        parsers = getattr(_parser_pool, "parsers", None)
+        if parsers is None:
+            parsers = _parser_pool.parsers = {}
+
+        parser = parsers.get(language)
+        if parser is None:
+            registry_parser = self.registry.get_parser(language)
+            if registry_parser is None:
+                return None
+            parser = Parser(registry_parser.language)
+            parsers[language] = parser
+        return parser
+
+    def parse(self, parser: Parser, language: str, source: bytes) -> Tree:
+        """Parse source with Tree-sitter, reusing the tree for identical content."""
+        key = (language, hashlib.sha256(source).digest())
+        with self._tree_cache_lock:
+            tree = self._tree_cache.get(key)
+            if tree is not None:
+                self._tree_cache.move_to_end(key)
+                return tree
+
+        # Parse outside the lock so worker threads parse in parallel
+        tree = parser.parse(source)
+        with self._tree_cache_lock:
+            self._tree_cache[key] = tree
+            if len(self._tree_cache) > TREE_CACHE_SIZE:
+                self._tree_cache.popitem(last=False)
+        return tree
+
+    def extract(
+        self, language: str, source: bytes, spans: List[Tuple[str, int, int]]
+    ) -> List[SymbolReference]:
+        """
+        Collect symbol references for every chunk of a file.
+
+        Args:
+            language: Language name as known to the registry
+            source: Raw file contents
+            spans: (chunk_id, start_line, end_line) per chunk, 1-based lines
+
+        Returns:
+            Symbol references in traversal order
+        """
+        parser = self.get_parser(language)
+        if not parser:
+            logger.debug(f"No parser available for {language}")
+            return []
+
+        target_types = self._get_target_types(language)
+        if not target_types:
+            return []
+
+        tree = self.parse(parser, language, source)
+        text = SourceText(source)
+
+        query = self._get_query(language, parser)
+        if query is not None:
+            try:
+                return self._extract_with_query(query, tree, spans, language, text)
+            except Exception as e:
+                # Stop trying the query for this language rather than failing
+                # again on every file
+                self._queries[language] = None
+                logger.warning(
+                    f"Query extraction failed for {language}, "
+                    f"walking the tree instead: {e}"
+                )
+
+        prune_types = self._get_prune_types(language, parser)
+        return self._extract_with_walk(
+            tree, spans, language, target_types, prune_types, text
+        )
+
+    def _get_query(self, language: str, parser: Parser) -> Optional[Query]:
+        """
+        Compile (once) a query capturing every candidate node type of a language.
+
+        Node types are grouped by dependency type and each group is captured
+        under that name (@imports, @calls, ...), so matches arrive already
+        classified.
+        """
+        if language in self._queries:
+            return self._queries[language]
+
+        query = None
+        try:
+            ts_language = parser.language
+            # Only node kinds that exist in the grammar may appear in a query
+            node_types = sorted(
+                node_type
+                for node_type in self._get_target_types(language)
+                if ts_language.id_for_node_kind(node_type, True)
+            )
+            groups: Dict[str, List[str]] = {}
+            for node_type in node_types:
+                dependency_type = self._get_dependency_type_from_node(
+                    node_type, language
+                )
+                groups.setdefault(dependency_type, []).append(node_type)
+
+            patterns = []
+            for dependency_type, types in groups.items():
+                alternatives = " ".join(f"({node_type})" for node_type in types)
+                patterns.append(f"[{alternatives}] @{dependency_type}")
+            if patterns:
+                query = Query(ts_language, "\n".join(patterns))
+        except Exception as e:
+            logger.warning(f"Failed to compile dependency query for {language}: {e}")
+
+        self._queries[language] = query
+        return query
+
+    def _extract_with_query(
+        self,
+        query: Query,
+        tree: Tree,
+        spans: List[Tuple[str, int, int]],
+        language: str,
+        text: SourceText,
+    ) -> List[SymbolReference]:
+        """Match candidates for the whole file at once and bucket them into chunks."""
+        # Chunks may overlap or nest, so map each row to every chunk covering it
+        chunks_by_row: List[List[str]] = [
+            [] for _ in range(tree.root_node.end_point[0] + 1)
+        ]
+        last_row = len(chunks_by_row)
+        for chunk_id, start_line, end_line in spans:
+            for row in range(max(start_line - 1, 0), min(end_line, last_row)):
+                chunks_by_row[row].append(chunk_id)
+
+        references: List[SymbolReference] = []
+        if QueryCursor is not None:
+            captures = QueryCursor(query).captures(tree.root_node)
+        else:
+            captures = query.captures(tree.root_node)
+        for dependency_type, nodes in captures.items():
+            for node in nodes:
+                chunk_ids = chunks_by_row[node.start_point[0]]
+                if not chunk_ids:
+                    continue
+
+                reference = self._make_reference(
+                    node, chunk_ids[0], language, text, dependency_type
+                )
+                if not reference:
+                    continue
+                references.append(reference)
+                for chunk_id in chunk_ids[1:]:
+                    references.append(replace(reference, chunk_id=chunk_id))
+        return references
+
+    def _extract_with_walk(
+        self,
+        tree: Tree,
+        spans: List[Tuple[str, int, int]],
+        language: str,
+        target_types: FrozenSet[str],
+        prune_types: FrozenSet[str],
+        text: SourceText,
+    ) -> List[SymbolReference]:
+        """Walk each chunk's subtree for grammars without a usable query."""
+        references: List[SymbolReference] = []
+
+        for chunk_id, start_line, end_line in spans:
+            try:
+                # Start from the smallest node that spans the chunk's lines
+                start_row = start_line - 1
+                end_row = end_line - 1
+                node = tree.root_node.descendant_for_point_range(
+                    (start_row, 0), (end_row, 0)
+                )
+                if node is None:
+                    node = tree.root_node
+
+                for candidate in self._iter_candidates(
+                    node, start_row, end_row, target_types, prune_types
+                ):
+                    reference = self._make_reference(
+                        candidate, chunk_id, language, text
+                    )
+                    if reference:
+                        references.append(reference)
+            except Exception as e:
+                logger.debug(f"Failed to extract symbols for {chunk_id}: {e}")
+
+        return references
+
+    def _get_target_types(self, language: str) -> FrozenSet[str]:
+        """Collect all node types that might indicate dependencies."""
+        target_types = self._target_types_by_lang.get(language)
+        if target_types is not None:
+            return target_types
+
+        config = self.registry.get_config(language)
+        if not config:
+            logger.debug(f"No config available for language: {language}")
+            return frozenset()
+
+        types = set(COMMON_DEPENDENCY_TYPES)
+        for node_type_list in config.node_types.values():
+            types.update(node_type_list)
+
+        target_types = frozenset(types)
+        self._target_types_by_lang[language] = target_types
+        return target_types
+
+    def _get_prune_types(self, language: str, parser: Parser) -> FrozenSet[str]:
+        """Collect the grammar's node types whose subtrees hold no references."""
+        prune_types = self._prune_types_by_lang.get(language)
+        if prune_types is not None:
+            return prune_types
+
+        try:
+            ts_language = parser.language
+            kinds = (
+                ts_language.node_kind_for_id(kind_id)
+                for kind_id in range(ts_language.node_kind_count)
+            )
+            prune_types = frozenset(
+                kind
+                for kind in kinds
+                if kind and ("comment" in kind or kind in PRUNE_NODE_TYPES)
+            )
+        except Exception as e:
+            logger.debug(f"Failed to read node kinds for {language}: {e}")
+            prune_types = PRUNE_NODE_TYPES
+
+        self._prune_types_by_lang[language] = prune_types
+        return prune_types
+
+    def _iter_candidates(
+        self,
+        node: Node,
+        start_row: int,
+        end_row: int,
+        target_types: FrozenSet[str],
+        prune_types: FrozenSet[str],
+    ) -> Iterator[Node]:
+        """Walk the subtree with a TreeCursor and yield nodes of interest in the rows."""
+        cursor = node.walk()
+        visited_children = False
+
+        while True:
+            if not visited_children:
+                current = cursor.node
+                current_start = current.start_point[0]
+
+                if current_start > end_row:
+                    # Later siblings start even further down; leave this level
+                    if not cursor.goto_parent():
+                        return
+                    visited_children = True
+                    continue
+
+                if current.end_point[0] >= start_row:
+                    current_type = current.type
+                    if current_type in target_types and current_start >= start_row:
+                        yield current
+                    # Comments and string bodies never contain references
+                    if current_type not in prune_types and cursor.goto_first_child():
+                        continue
+
+            if cursor.goto_next_sibling():
+                visited_children = False
+            elif cursor.goto_parent():
+                visited_children = True
+            else:
+                return
+
+    def _make_reference(
+        self,
+        node: Node,
+        chunk_id: str,
+        language: str,
+        text: SourceText,
+        dependency_type: Optional[str] = None,
+    ) -> Optional[SymbolReference]:
+        """Build a symbol reference for a candidate node."""
+        node_type = node.type
+
+        # Query captures are already classified; walked nodes are looked up
+        if dependency_type is None:
+            dependency_type = self._get_dependency_type_from_node(node_type, language)
+        if not dependency_type:
+            return None
+
+        # Non-import names of two characters or less are dropped by the
+        # resolver, and a name is never longer than its node's bytes, so
+        # such nodes are skipped before any text is decoded
+        is_import = dependency_type == "imports"
+        if not is_import and node.end_byte - node.start_byte <= 2:
+            return None
+
+        # Get the symbol name from the node
+        symbol_name = self._extract_symbol_name(node, language, text)
+        if not symbol_name:
+            return None
+        if not is_import and (len(symbol_name) <= 2 or symbol_name.isdigit()):
+            return None
+
+        # Positions come from the whole-file tree, so they are already
+        # absolute 0-based LSP coordinates
+        return SymbolReference(
+            chunk_id=chunk_id,
+            symbol_name=symbol_name,
+            line=node.start_point[0],
+            character=node.start_point[1],
+            dependency_type=dependency_type,
+            node_type=node_type,
+        )
+
+    def _extract_symbol_name(
+        self, node: Node, language: str, text: SourceText
+    ) -> Optional[str]:
+        """Extract symbol name from AST node using generic patterns."""
+        node_type = node.type
+        extractors = self._name_extractors.get(node_type)
+        if extractors is None:
+            extractors = _select_name_extractors(node_type)
+            self._name_extractors[node_type] = extractors
+
+        try:
+            # Patterns are tried in order until one of them finds a name
+            for extractor in extractors:
+                symbol_name = extractor(node, text)
+                if symbol_name is not None:
+                    return symbol_name
+        except Exception as e:
+            logger.debug(f"Failed to extract symbol name from {node_type}: {e}")
+
+        return None
+
+    def _get_dependency_type_from_node(
+        self, node_type: str, language: str
+    ) -> Optional[str]:
+        """Map AST node types to dependency types."""
+        dependency_type = self._dependency_types.get(node_type)
+        if dependency_type is None:
+            dependency_type = _classify_node_type(node_type)
+            self._dependency_types[node_type] = dependency_type
+        return dependency_type
+
+
+def _classify_node_type(node_type: str) -> str:
+    """Generic node type classification used for types missing from the table."""
+    if "import" in node_type:
+        return "imports"
+    elif "call" in node_type:
+        return "calls"
+    elif "new" in node_type:
+        return "instantiates"
+    return "uses"
+
+
+def _name_of_identifier(node: Node, text: SourceText) -> Optional[str]:
+    """Identifiers name themselves."""
+    return text(node)
+
+
+def _name_of_import(node: Node, text: SourceText) -> Optional[str]:
+    """Import/require statements: the module string literal or name."""
+    for child in node.children:
+        if child.type in STRING_NODE_TYPES:
+            return text(child).strip("\"'")
+        elif child.type in IMPORT_NAME_NODE_TYPES:
+            return text(child)
+    return None
+
+
+def _name_of_call(node: Node, text: SourceText) -> Optional[str]:
+    """Function/method calls: the callable's name."""
+    if node.child_count > 0:
+        first_child = node.children[0]
+        if first_child.type == "identifier":
+            return text(first_child)
+        elif first_child.child_count > 0:
+            # Handle member access like obj.method()
+            return text(first_child.children[-1])
+    return None
+
+
+def _name_of_member(node: Node, text: SourceText) -> Optional[str]:
+    """Member/attribute access: usually the last child is the member name."""
+    if node.child_count >= 2:
+        return text(node.children[-1])
+    return None
+
+
+def _name_of_new(node: Node, text: SourceText) -> Optional[str]:
+    """New expressions: the type being instantiated."""
+    if node.child_count > 0:
+        return text(node.children[0])
+    return None
+
+
+def _name_of_first_identifier(node: Node, text: SourceText) -> Optional[str]:
+    """Any other node: its first identifier child."""
+    for child in node.children:
+        if child.type == "identifier":
+            return text(child)
+    return None
+
+
+def _select_name_extractors(node_type: str) -> Tuple[NameExtractor, ...]:
+    """Pick the name extraction patterns that apply to a node type, in order."""
+    if node_type == "identifier":
+        return (_name_of_identifier,)
+
+    extractors: List[NameExtractor] = []
+    if "import" in node_type or "require" in node_type or "use" in node_type:
+        extractors.append(_name_of_import)
+    if "call" in node_type:
+        extractors.append(_name_of_call)
+    if node_type in MEMBER_NODE_TYPES:
+        extractors.append(_name_of_member)
+    if "new" in node_type:
+        extractors.append(_name_of_new)
+    extractors.append(_name_of_first_identifier)
+    return tuple(extractors)
+
+
+# Per-process extractor, created lazily so worker processes build their own
+_symbol_extractor: Optional[SymbolExtractor] = None
+
+
+def get_symbol_extractor() -> SymbolExtractor:
+    """Get the symbol extractor for the current process."""
+    global _symbol_extractor
+    if _symbol_extractor is None:
+        _symbol_extractor = SymbolExtractor()
+    return _symbol_extractor
+
+
+def extract_file_references(
+    language: str, source: bytes, spans: List[Tuple[str, int, int]]
+) -> List[SymbolReference]:
+    """Worker entry point: extract symbol references for one file."""
+    return get_symbol_extractor().extract(language, source, spans)
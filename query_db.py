@@ -13,17 +13,81 @@ Usage:
 """
 
 import sys
+import atexit
 import asyncio
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 from services.codebase_service import CodebaseService
 from storage.database import CodeMindDatabase
 from storage.graph_store import Neo4jGraphStore
 from config import Config
 
+QDRANT_HOST = "localhost"
+QDRANT_GRPC_PORT = 6334
+
+# Maximum concurrent point lookups when searching every collection
+MAX_CONCURRENT_RETRIEVES = 16
+
+# Maximum concurrent collection deletions when clearing the vector database
+MAX_CONCURRENT_DELETES = 8
+
+# Chunks shown by list-chunks, matched against the chunk_type payload index
+LISTED_CHUNKS_FILTER = models.Filter(
+    must=[
+        models.FieldCondition(
+            key="chunk_type", match=models.MatchAny(any=["function", "class"])
+        )
+    ]
+)
+LISTED_CHUNK_FIELDS = ["chunk_type", "name", "file_path", "start_line", "end_line"]
+
+# Points fetched per scroll request
+SCROLL_PAGE_SIZE = 256
+
+_qdrant_client = None
+_database = None
+_graph_store = None
+
+
+def get_qdrant_client() -> QdrantClient:
+    """Get the shared Qdrant client, talking gRPC instead of REST."""
+    global _qdrant_client
+    if _qdrant_client is None:
+        _qdrant_client = QdrantClient(
+            host=QDRANT_HOST, grpc_port=QDRANT_GRPC_PORT, prefer_grpc=True
+        )
+    return _qdrant_client
+
+
+def get_database() -> CodeMindDatabase:
+    """Get the shared multi-repository database."""
+    global _database
+    if _database is None:
+        _database = CodeMindDatabase()
+    return _database
+
+
+def get_graph_store() -> Neo4jGraphStore:
+    """Get the shared graph store."""
+    global _graph_store
+    if _graph_store is None:
+        _graph_store = Neo4jGraphStore()
+    return _graph_store
+
+
+@atexit.register
+def _close_clients():
+    """Close whichever shared clients were opened."""
+    for client in (_database, _graph_store, _qdrant_client):
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
 
 def list_repositories():
     """List all indexed repositories."""
-    db = CodeMindDatabase()
+    db = get_database()
     repos = db.list_repositories()
 
     print("=== INDEXED REPOSITORIES ===")
@@ -35,7 +99,7 @@ def list_repositories():
 
 def list_chunks(repo_filter=None):
     """List code chunks, optionally filtered by repository."""
-    client = QdrantClient(host="localhost", port=6333)
+    client = get_qdrant_client()
 
     # Get all collections
     collections = client.get_collections()
@@ -47,16 +111,10 @@ def list_chunks(repo_filter=None):
 
         print(f"\nCollection: {collection.name}")
 
-        # Get functions and classes
-        points = client.scroll(
-            collection_name=collection.name,
-            scroll_filter=None,  # Removing filter for now as it's causing type issues
-            limit=20,
-            with_payload=True,
-            with_vectors=False,
-        )
-
-        for point in points[0]:
+        # Get functions and classes; only the listed fields are transferred
+        for point in _scroll_points(
+            client, collection.name, LISTED_CHUNKS_FILTER, LISTED_CHUNK_FIELDS
+        ):
             if payload := point.payload:  # Using assignment expression to handle None
                 file_path = payload.get("file_path", "").split("/")[-1]
                 chunk_type = payload.get("chunk_type", "N/A").upper()
@@ -68,6 +126,23 @@ def list_chunks(repo_filter=None):
                 print(f"    File: {file_path} (lines {start_line}-{end_line})")
 
 
+def _scroll_points(client, collection_name, scroll_filter, payload_fields):
+    """Yield every matching point of a collection, one scroll page at a time."""
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=SCROLL_PAGE_SIZE,
+            offset=offset,
+            with_payload=payload_fields,
+            with_vectors=False,
+        )
+        yield from points
+        if offset is None:
+            break
+
+
 async def search_code(query):
     """Search code using semantic similarity."""
     config = Config.load()
@@ -79,88 +154,126 @@ async def search_code(query):
         score_threshold=0.1,  # Lower threshold for UniXcoder
     )
 
-    print(f"=== SEARCH RESULTS FOR: '{query}' ===")
-    print(f"Found {len(result.chunks)} results in {result.duration:.2f}s")
-    print()
+    # Collect the whole report and write it once rather than line by line
+    lines = [
+        f"=== SEARCH RESULTS FOR: '{query}' ===",
+        f"Found {len(result.chunks)} results in {result.duration:.2f}s",
+        "",
+    ]
 
     for i, chunk in enumerate(result.chunks, 1):
-        file_path = chunk["file_path"].split("/")[-1]
-        print(f"{i}. {chunk['chunk_type'].upper()}: {chunk['name']}")
-        print(f"   File: {file_path}")
-        print(f"   Score: {chunk['score']:.3f}")
-        print(f"   Lines: {chunk['start_line']}-{chunk['end_line']}")
+        file_path = chunk["file_path"].rsplit("/", 1)[-1]
+        lines.append(f"{i}. {chunk['chunk_type'].upper()}: {chunk['name']}")
+        lines.append(f"   File: {file_path}")
+        lines.append(f"   Score: {chunk['score']:.3f}")
+        lines.append(f"   Lines: {chunk['start_line']}-{chunk['end_line']}")
 
         # Show content preview for high-scoring results
         if chunk["score"] > 0.8:
             content = chunk["content"][:200].replace("\n", " ")
-            print(f"   Preview: {content}...")
-        print()
+            lines.append(f"   Preview: {content}...")
+        lines.append("")
 
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def show_chunk(chunk_id):
-    """Show full content of a specific chunk."""
-    client = QdrantClient(host="localhost", port=6333)
 
-    # Search across all collections
-    collections = client.get_collections()
+async def show_chunk(chunk_id):
+    """Show full content of a specific chunk."""
+    client = AsyncQdrantClient(
+        host=QDRANT_HOST, grpc_port=QDRANT_GRPC_PORT, prefer_grpc=True
+    )
+    # Bounded so repositories with many collections do not flood the server
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_RETRIEVES)
+
+    async def retrieve(collection_name):
+        async with semaphore:
+            try:
+                return await client.retrieve(
+                    collection_name=collection_name,
+                    ids=[int(chunk_id)],
+                    with_payload=True,
+                    with_vectors=False,
+                )
+            except Exception:
+                return []
 
-    for collection in collections.collections:
+    try:
+        # Search across all collections at once; the first hit wins
+        collections = await client.get_collections()
+        tasks = [
+            asyncio.create_task(retrieve(collection.name))
+            for collection in collections.collections
+        ]
         try:
-            point = client.retrieve(
-                collection_name=collection.name,
-                ids=[int(chunk_id)],
-                with_payload=True,
-                with_vectors=False,
-            )
-
-            if point and (payload := point[0].payload):  # Using assignment expression
-                print(f"=== CHUNK {chunk_id} ===")
-                # Extract all values with defaults to handle None safely
-                chunk_type = payload.get("chunk_type", "N/A")
-                name = payload.get("name", "N/A")
-                file_path = payload.get("file_path", "N/A")
-                start_line = payload.get("start_line", "N/A")
-                end_line = payload.get("end_line", "N/A")
-                language = payload.get("language", "N/A")
-                content = payload.get("content", "No content")
-
-                # Print the information
-                print(f"Type: {chunk_type}")
-                print(f"Name: {name}")
-                print(f"File: {file_path}")
-                print(f"Lines: {start_line}-{end_line}")
-                print(f"Language: {language}")
-                print("\n--- CONTENT ---")
-                print(content)
-                return
-        except Exception:
-            continue
+            for next_result in asyncio.as_completed(tasks):
+                point = await next_result
+                if point and (payload := point[0].payload):
+                    _print_chunk(chunk_id, payload)
+                    return
+        finally:
+            for task in tasks:
+                task.cancel()
+    finally:
+        await client.close()
 
     print(f"Chunk {chunk_id} not found")
 
 
-def clear_vector_db():
+def _print_chunk(chunk_id, payload):
+    """Print a chunk's payload."""
+    print(f"=== CHUNK {chunk_id} ===")
+    # Extract all values with defaults to handle None safely
+    chunk_type = payload.get("chunk_type", "N/A")
+    name = payload.get("name", "N/A")
+    file_path = payload.get("file_path", "N/A")
+    start_line = payload.get("start_line", "N/A")
+    end_line = payload.get("end_line", "N/A")
+    language = payload.get("language", "N/A")
+    content = payload.get("content", "No content")
+
+    # Print the information
+    print(f"Type: {chunk_type}")
+    print(f"Name: {name}")
+    print(f"File: {file_path}")
+    print(f"Lines: {start_line}-{end_line}")
+    print(f"Language: {language}")
+    print("\n--- CONTENT ---")
+    print(content)
+
+
+async def clear_vector_db():
     """Clear all vector database collections."""
-    client = QdrantClient(host="localhost", port=6333)
+    client = AsyncQdrantClient(
+        host=QDRANT_HOST, grpc_port=QDRANT_GRPC_PORT, prefer_grpc=True
+    )
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DELETES)
+
+    async def delete(collection_name):
+        async with semaphore:
+            print(f"Deleting collection: {collection_name}")
+            await client.delete_collection(collection_name)
 
     try:
-        collections = client.get_collections()
+        collections = await client.get_collections()
         print("=== CLEARING VECTOR DATABASE ===")
 
-        for collection in collections.collections:
-            print(f"Deleting collection: {collection.name}")
-            client.delete_collection(collection.name)
+        # Collections are independent, so delete them concurrently
+        await asyncio.gather(
+            *(delete(collection.name) for collection in collections.collections)
+        )
 
         print("✅ Vector database cleared successfully")
 
     except Exception as e:
         print(f"❌ Error clearing vector database: {e}")
+    finally:
+        await client.close()
 
 
 def clear_graph_db():
     """Clear all graph database data."""
     try:
-        graph = Neo4jGraphStore()
+        graph = get_graph_store()
         print("=== CLEARING GRAPH DATABASE ===")
 
         success = graph.clear_graph()
@@ -169,8 +282,6 @@ def clear_graph_db():
         else:
             print("❌ Failed to clear graph database")
 
-        graph.close()
-
     except Exception as e:
         print(f"❌ Error clearing graph database: {e}")
 
@@ -186,17 +297,16 @@ def clear_all_databases():
         print("❌ Operation cancelled")
         return
 
-    clear_vector_db()
+    asyncio.run(clear_vector_db())
     clear_graph_db()
 
     # Also clear the repository tracking in the main database
     try:
-        db = CodeMindDatabase()
-        # Clear repository records (this will cascade to chunks)
-        repos = db.list_repositories()
-        for repo in repos:
-            print(f"Removing repository record: {repo.repo_url}")
-            db.delete_repository(repo.repo_url)
+        db = get_database()
+        # Clear any remaining repository records in one pass
+        removed = db.delete_all_repositories()
+        if removed:
+            print(f"Removed {removed} repository records")
 
         print("✅ All databases cleared successfully")
         print("💡 You can now re-index with a new embedding model")
@@ -222,11 +332,11 @@ def main():
         asyncio.run(search_code(query))
     elif command == "show-chunk" and len(sys.argv) > 2:
         chunk_id = sys.argv[2]
-        show_chunk(chunk_id)
+        asyncio.run(show_chunk(chunk_id))
     elif command == "clear-all":
         clear_all_databases()
     elif command == "clear-vector":
-        clear_vector_db()
+        asyncio.run(clear_vector_db())
     elif command == "clear-graph":
         clear_graph_db()
     else:
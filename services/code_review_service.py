@@ -3,19 +3,26 @@ Specialized service for AI-powered code reviews.
 Uses the CodebaseService for context-aware review generation.
 """
 
+import asyncio
+import threading
 import time
-from typing import Optional
+from typing import Callable, List, Optional
 from dataclasses import dataclass
 
 from services.codebase_service import CodebaseService
 from inference.openai_client import LLMClient
 from inference.prompt_builder import PromptBuilder
-from processing.diff_processor import DiffProcessor
+from processing.diff_processor import ChangedChunk, DiffProcessor
 from processing.reranker import CodeReranker
+from storage.review_cache import ReviewCache
 
 from monitoring.telemetry import get_telemetry
+from utils.http_client import GITHUB_DIFF_HEADERS, get_http_client
 from utils.logging import get_logger
 
+# Maximum context search queries per review, whole-diff query included
+MAX_CONTEXT_QUERIES = 16
+
 
 @dataclass
 class ReviewResult:
@@ -33,13 +40,36 @@ class CodeReviewService:
         self.logger = logger_instance or get_logger(__name__)
         self.telemetry = get_telemetry()
         self.prompt_builder = PromptBuilder()
+        self.diff_processor = DiffProcessor()
+        # The chunker's Tree-sitter parsers are not safe to share across threads
+        self._diff_lock = threading.Lock()
         self.codebase_service = codebase_service or CodebaseService(config)
+        self._review_cache: Optional[ReviewCache] = None
+
+    def _get_review_cache(self) -> Optional[ReviewCache]:
+        """Get the review cache, or None when it is disabled."""
+        if not getattr(self.config, "semantic_cache_enabled", False):
+            return None
+
+        if self._review_cache is None:
+            database = self.codebase_service.database
+            try:
+                self._review_cache = ReviewCache(
+                    host=database.qdrant_host,
+                    port=database.qdrant_port,
+                    ttl_seconds=self.config.semantic_cache_ttl_seconds,
+                )
+            except Exception as e:
+                self.logger.warning(f"Review cache unavailable: {e}")
+                return None
+        return self._review_cache
 
     async def review_diff(
         self,
         diff_content: str,
         repo_url: Optional[str] = None,
         context_enabled: bool = True,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Optional[ReviewResult]:
         """
         Review a diff with optional codebase context.
@@ -48,6 +78,8 @@ class CodeReviewService:
             diff_content: The diff content to review
             repo_url: Optional repository URL for context
             context_enabled: Whether to use codebase context
+            on_token: Optional callback receiving the review text as it is
+                generated; not called when a cached review is returned
 
         Returns:
             ReviewResult with review details
@@ -59,11 +91,26 @@ class CodeReviewService:
         ):
             self.logger.info(f"Reviewing diff (context: {context_enabled})")
 
+            review_cache = self._get_review_cache() if context_enabled else None
+            diff_sha256 = ReviewCache.diff_hash(diff_content) if review_cache else None
+
+            # A repeat of an already reviewed diff needs no parsing or embedding
+            if review_cache:
+                cached = await asyncio.to_thread(
+                    self._lookup_cached_review,
+                    review_cache,
+                    diff_sha256,
+                    repo_url,
+                    review_start,
+                )
+                if cached:
+                    return cached
+
             # Process diff to extract changed chunks
             with self.telemetry.trace_operation("process_diff"):
-                processor = DiffProcessor()
-                changed_chunks = processor.extract_changed_chunks(
-                    diff_content, repo_url
+                # Parsing and chunking are CPU-bound; keep the event loop free
+                changed_chunks = await asyncio.to_thread(
+                    self._extract_changed_chunks, diff_content, repo_url
                 )
 
             self.logger.info(f"Found {len(changed_chunks)} changed chunks")
@@ -73,26 +120,38 @@ class CodeReviewService:
                 self.logger.info("No code chunks changed. Creating generic review.")
                 query = "code review"
             else:
-                query = processor.create_query_from_changes(changed_chunks)
+                query = self.diff_processor.create_query_from_changes(changed_chunks)
 
             async with LLMClient(config=self.config) as client:
                 try:
                     reranked_results = []
+                    query_embedding = None
 
                     if context_enabled:
                         # Search for related code using the codebase service
                         with self.telemetry.trace_operation("vector_search"):
                             retrieval_start = time.time()
-                            query_embedding = await client.embed(query)
-
-                            # Search in database through codebase service
-                            search_results = (
-                                self.codebase_service.database.search_similar_code(
-                                    query_embedding,
-                                    repo_url=repo_url,
-                                    limit=self.config.vector_search_k,
-                                    score_threshold=0.7,
-                                )
+                            # One query for the whole diff plus one per changed
+                            # chunk, embedded together in a single request
+                            queries = self._build_context_queries(
+                                changed_chunks, query
+                            )
+                            if len(queries) == 1:
+                                # Reruns of the same diff produce the same query
+                                query_embeddings = [await client.embed_query(query)]
+                            else:
+                                query_embeddings = await client.embed_batch(queries)
+                            query_embedding = query_embeddings[0]
+
+                            # Search in database through codebase service; the
+                            # Qdrant client blocks, so keep it off the event loop
+                            database = self.codebase_service.database
+                            search_results = await asyncio.to_thread(
+                                database.search_similar_code_batch,
+                                query_embeddings,
+                                repo_url=repo_url,
+                                limit=self.config.vector_search_k,
+                                score_threshold=0.7,
                             )
 
                             retrieval_duration = time.time() - retrieval_start
@@ -136,9 +195,17 @@ class CodeReviewService:
                         review_type = "quick"
 
                     with self.telemetry.trace_operation("generate_review"):
-                        review = await client.complete(
-                            [{"role": "user", "content": review_prompt}]
-                        )
+                        messages = [{"role": "user", "content": review_prompt}]
+                        if on_token is None:
+                            review = await client.complete(messages)
+                        else:
+                            # Stream so the caller can show the review while
+                            # the rest of it is still being generated
+                            fragments = []
+                            async for fragment in client.stream_complete(messages):
+                                on_token(fragment)
+                                fragments.append(fragment)
+                            review = "".join(fragments)
 
                     # Record total review duration
                     review_duration = time.time() - review_start
@@ -146,7 +213,7 @@ class CodeReviewService:
                         review_duration, {"review_type": review_type}
                     )
 
-                    return ReviewResult(
+                    result = ReviewResult(
                         review_content=review,
                         changed_chunks_count=len(changed_chunks),
                         context_chunks_count=len(reranked_results),
@@ -154,10 +221,91 @@ class CodeReviewService:
                         review_type=review_type,
                     )
 
+                    if review_cache and query_embedding is not None and review:
+                        self._cache_review(
+                            review_cache, query_embedding, diff_sha256, repo_url, result
+                        )
+
+                    return result
+
                 except Exception as e:
                     self.logger.error(f"Error during review: {e}")
                     return None
 
+    def _extract_changed_chunks(
+        self, diff_content: str, repo_url: Optional[str]
+    ) -> List[ChangedChunk]:
+        """Extract changed chunks, one diff at a time; runs in a worker thread."""
+        with self._diff_lock:
+            return self.diff_processor.extract_changed_chunks(diff_content, repo_url)
+
+    def _build_context_queries(
+        self, changed_chunks: List[ChangedChunk], query: str
+    ) -> List[str]:
+        """Build the whole-diff query followed by distinct per-chunk queries."""
+        queries = [query]
+        seen = {query}
+        for changed_chunk in changed_chunks:
+            if len(queries) >= MAX_CONTEXT_QUERIES:
+                break
+            chunk_query = self.diff_processor.create_query_from_changes(
+                [changed_chunk]
+            )
+            if chunk_query not in seen:
+                seen.add(chunk_query)
+                queries.append(chunk_query)
+        return queries
+
+    def _lookup_cached_review(
+        self,
+        review_cache: ReviewCache,
+        diff_sha256: str,
+        repo_url: Optional[str],
+        review_start: float,
+    ) -> Optional[ReviewResult]:
+        """Return a fresh cached review of the identical diff, if there is one."""
+        try:
+            cached = review_cache.lookup_exact(diff_sha256, repo_url)
+        except Exception as e:
+            self.logger.warning(f"Review cache lookup failed: {e}")
+            return None
+
+        if not cached:
+            return None
+
+        self.logger.info("Using cached review of identical diff")
+        return ReviewResult(
+            review_content=cached["review_content"],
+            changed_chunks_count=cached.get("changed_chunks_count", 0),
+            context_chunks_count=cached.get("context_chunks_count", 0),
+            duration=time.time() - review_start,
+            review_type=cached.get("review_type", "contextual"),
+        )
+
+    def _cache_review(
+        self,
+        review_cache: ReviewCache,
+        query_embedding: List[float],
+        diff_sha256: str,
+        repo_url: Optional[str],
+        result: ReviewResult,
+    ):
+        """Store a freshly generated review in the semantic cache."""
+        try:
+            review_cache.store_review(
+                query_embedding,
+                diff_sha256,
+                repo_url,
+                result.review_content,
+                {
+                    "changed_chunks_count": result.changed_chunks_count,
+                    "context_chunks_count": result.context_chunks_count,
+                    "review_type": result.review_type,
+                },
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to cache review: {e}")
+
     async def quick_review(self, diff_content: str) -> Optional[ReviewResult]:
         review_start = time.time()
         self.logger.info("Performing quick review")
@@ -198,17 +346,14 @@ class CodeReviewService:
             ReviewResult with review details
         """
         try:
-            # Download diff content
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.get(pr_diff_url)
-                if response.status_code != 200:
-                    self.logger.error(
-                        f"Failed to download diff: {response.status_code}"
-                    )
-                    return None
-                diff_content = response.text
+            # Download diff content over the shared keep-alive connection pool
+            response = await get_http_client().get(
+                pr_diff_url, headers=GITHUB_DIFF_HEADERS
+            )
+            if response.status_code != 200:
+                self.logger.error(f"Failed to download diff: {response.status_code}")
+                return None
+            diff_content = response.text
 
             # Review with context
             result = await self.review_diff(
@@ -3,13 +3,19 @@ Core codebase service that handles indexing, search, and AI-powered interactions
 This is the main service for the AI-powered codebase platform.
 """
 
+import asyncio
+import os
 import time
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
 from storage.database import CodeMindDatabase, CodeChunk, RepositoryInfo
+from storage.embedding_cache import EmbeddingCache
+from storage.query_cache import SemanticQueryCache
 from graph_engine.summarizer import HierarchicalSummarizer
 from core.chunker import TreeSitterChunker
 from core.fallback_chunker import ChunkingConfig
@@ -25,6 +31,98 @@ from utils.local_repo_manager import (
     is_local_path,
 )
 
+# Chunks extracted, embedded and stored together while indexing
+INDEX_BATCH_SIZE = 256
+
+# Extracted batches allowed to wait for embedding before extraction pauses
+MAX_PENDING_BATCHES = 4
+
+# Contents hashed per worker task when hashing a large repository in parallel
+HASH_SLICE_SIZE = 512
+
+# Characters of each context chunk returned with a chat answer
+CONTEXT_PREVIEW_CHARS = 500
+
+# Chunk metadata returned with search results and chat context, with defaults
+CHAT_CONTEXT_FIELDS = (
+    ("file_path", ""),
+    ("chunk_type", ""),
+    ("name", ""),
+    ("start_line", 0),
+    ("end_line", 0),
+    ("repo_url", None),
+)
+SEARCH_RESULT_FIELDS = CHAT_CONTEXT_FIELDS + (("language", ""), ("summary", None))
+
+# Summary jobs still running after index_repository returned; referenced here
+# so they are not garbage collected while the event loop runs them
+_background_tasks: Set[asyncio.Task] = set()
+
+# Search results shared by all service instances in the process
+_query_cache: Optional[SemanticQueryCache] = None
+
+
+def _hash_slice(contents: List[str]) -> List[str]:
+    """SHA-256 hex digest of each content."""
+    return [hashlib.sha256(content.encode("utf-8")).hexdigest() for content in contents]
+
+
+def _hash_contents(contents: List[str]) -> List[str]:
+    """
+    Hash many contents, spreading large inputs over a thread pool.
+
+    hashlib releases the GIL while hashing buffers over 2 KiB, so slices of
+    larger chunks are hashed in parallel on multi-core machines.
+    """
+    workers = min(os.cpu_count() or 1, -(-len(contents) // HASH_SLICE_SIZE))
+    if workers <= 1:
+        return _hash_slice(contents)
+
+    slices = [
+        contents[start : start + HASH_SLICE_SIZE]
+        for start in range(0, len(contents), HASH_SLICE_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [
+            digest
+            for digests in executor.map(_hash_slice, slices)
+            for digest in digests
+        ]
+
+
+def _iter_file_chunks(chunker: TreeSitterChunker, path: Path) -> Iterator[Any]:
+    """Read and chunk a single file lazily, on whichever thread iterates."""
+    yield from chunker.chunk_file(str(path), path.read_text())
+
+
+def _take_hashed_batch(
+    chunk_iter: Iterator[Any],
+) -> Optional[Tuple[List[Any], List[str]]]:
+    """Take the next batch of chunks with their content hashes, or None at the end."""
+    chunks = list(islice(chunk_iter, INDEX_BATCH_SIZE))
+    if not chunks:
+        return None
+    return chunks, _hash_contents([chunk.content for chunk in chunks])
+
+
+def _metadata_fields(
+    metadata: Dict[str, Any], fields: Tuple[Tuple[str, Any], ...]
+) -> Dict[str, Any]:
+    """Pick the given metadata fields, using each field's default when missing."""
+    return {key: metadata.get(key, default) for key, default in fields}
+
+
+def _clear_query_cache():
+    """Forget cached search results, e.g. after the indexed code changed."""
+    if _query_cache is not None:
+        _query_cache.clear()
+
+
+async def wait_for_background_tasks():
+    """Wait for chunk summaries still being generated in the background."""
+    while _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
 
 @dataclass
 class IndexResult:
@@ -73,11 +171,44 @@ class CodebaseService:
         self.telemetry = get_telemetry()
         self.prompt_builder = PromptBuilder()
         self.database = database or CodeMindDatabase()
+        self._embedding_cache: Optional[EmbeddingCache] = None
 
     def _content_hash(self, content: str) -> str:
         """Generate SHA-256 hash for content."""
         return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
+    def _get_embedding_cache(self) -> Optional[EmbeddingCache]:
+        """Open the on-disk embedding cache, or None when it is disabled."""
+        if not getattr(self.config, "embedding_cache_enabled", False):
+            return None
+
+        if self._embedding_cache is None:
+            try:
+                self._embedding_cache = EmbeddingCache(self.config.embedding_cache_path)
+            except Exception as e:
+                self.logger.warning(f"Embedding cache unavailable: {e}")
+                self.config.embedding_cache_enabled = False
+                return None
+        return self._embedding_cache
+
+    def _get_query_cache(self) -> Optional[SemanticQueryCache]:
+        """
+        Get the process-wide search result cache, or None when it is disabled.
+
+        Shared by every service instance, since the API creates one per request.
+        """
+        global _query_cache
+        if not getattr(self.config, "search_cache_enabled", False):
+            return None
+
+        if _query_cache is None:
+            _query_cache = SemanticQueryCache(
+                max_entries=self.config.search_cache_size,
+                similarity_threshold=self.config.search_cache_threshold,
+                ttl_seconds=self.config.search_cache_ttl_seconds,
+            )
+        return _query_cache
+
     async def index_repository(
         self,
         repo_path: str,
@@ -102,14 +233,18 @@ class CodebaseService:
             IndexResult with operation details
         """
         start_time = time.time()
+        subdirectory_only = False
+        single_file = False
 
         # Determine if this is a local path or remote URL
-        if is_local_path(repo_path):
+        is_local = is_local_path(repo_path)
+        if is_local:
             # Handle local repository or file
             path = Path(repo_path).resolve()
 
             if path.is_file():
                 # Single file - find the repository root but index only this file
+                single_file = True
                 local_repo_manager = get_local_repo_manager()
                 repo_info = local_repo_manager.get_repository_info(str(path.parent))
 
@@ -137,7 +272,7 @@ class CodebaseService:
                 final_branch = branch if branch != "main" else repo_info["branch"]
 
                 # Check if the requested path is a subdirectory of the repository
-                requested_path = Path(repo_path).resolve()
+                requested_path = path
                 repo_root = Path(repo_info["local_path"]).resolve()
 
                 if requested_path != repo_root and requested_path.is_relative_to(
@@ -145,6 +280,7 @@ class CodebaseService:
                 ):
                     # Index only the requested subdirectory
                     actual_path = str(requested_path)
+                    subdirectory_only = True
                     self.logger.info(f"Indexing subdirectory: {actual_path}")
                     self.logger.info(
                         f"Repository info: {final_owner}/{final_repo_name} (branch: {final_branch})"
@@ -188,42 +324,114 @@ class CodebaseService:
             {
                 "repo_path": actual_path,
                 "repo_url": final_repo_url,
-                "is_local": is_local_path(repo_path),
+                "is_local": is_local,
             },
         ):
+            # Extract code chunks lazily; they are embedded and stored in batches
+            # as extraction proceeds, so the whole repository is never in memory
+            chunking_config = ChunkingConfig(
+                max_chunk_size=getattr(self.config, "max_chunk_size", 1000),
+                min_chunk_size=getattr(self.config, "min_chunk_size", 50),
+                overlap_size=getattr(self.config, "chunk_overlap_size", 50),
+            )
+            chunker = TreeSitterChunker(chunking_config)
+            # Single files were identified above; a directory may not exist
+            path = Path(actual_path)
+            if single_file:
+                chunk_iter = _iter_file_chunks(chunker, path)
+            elif path.is_dir():
+                chunk_iter = chunker.iter_repository(str(path))
+            else:
+                return IndexResult(
+                    success=False,
+                    chunks_indexed=0,
+                    duration=time.time() - start_time,
+                    message=f"Invalid path: {actual_path}. Must be a file or directory.",
+                )
+
+            # Nothing to do when no file or setting changed since the last
+            # complete index and its collection is still there
+            state_hash = await asyncio.to_thread(
+                self._repository_state_hash,
+                chunker,
+                path,
+                single_file,
+                chunking_config,
+            )
+            if state_hash == self.database.get_index_state(final_repo_url):
+                self.logger.info(f"Repository unchanged since last index: {path}")
+                return IndexResult(
+                    success=True,
+                    chunks_indexed=0,
+                    duration=time.time() - start_time,
+                    message="Repository unchanged since last index",
+                )
+
             # Register repository in database
             self.database.register_repository(
                 final_repo_url, final_repo_name, final_owner, final_branch
             )
 
-            # Extract code chunks
-            with self.telemetry.trace_operation("extract_chunks"):
-                # Create chunking config from main config
-                chunking_config = ChunkingConfig(
-                    max_chunk_size=getattr(self.config, "max_chunk_size", 1000),
-                    min_chunk_size=getattr(self.config, "min_chunk_size", 50),
-                    overlap_size=getattr(self.config, "chunk_overlap_size", 50),
+            chunks_indexed = 0
+            indexed_hashes = set()
+
+            # Chunks are searchable once stored; their summaries are generated
+            # afterwards, without holding up the result
+            summary_queue: asyncio.Queue = asyncio.Queue()
+            summarizer = asyncio.create_task(
+                self._summarize_in_background(final_repo_url, summary_queue)
+            )
+            _background_tasks.add(summarizer)
+            summarizer.add_done_callback(_background_tasks.discard)
+
+            async with LLMClient(config=self.config) as client:
+                # Extraction runs ahead of embedding by at most a few batches
+                batches: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_BATCHES)
+                producer = asyncio.create_task(
+                    self._produce_chunk_batches(chunk_iter, batches)
                 )
-                chunker = TreeSitterChunker(chunking_config)
-                path = Path(actual_path)
-                if path.is_file():
-                    chunks = chunker.chunk_file(str(path), path.read_text())
-                elif path.is_dir():
-                    chunks = chunker.chunk_repository(str(path))
-                else:
+                try:
+                    while (batch := await batches.get()) is not None:
+                        chunks, content_hashes = batch
+                        code_chunks = await self._index_chunk_batch(
+                            client, chunks, content_hashes, final_repo_url
+                        )
+                        if code_chunks is None:
+                            return IndexResult(
+                                success=False,
+                                chunks_indexed=chunks_indexed,
+                                duration=time.time() - start_time,
+                                message="Failed to store chunks in database",
+                            )
+                        chunks_indexed += len(code_chunks)
+                        indexed_hashes.update(content_hashes)
+
+                        unsummarized = [
+                            chunk for chunk in code_chunks if chunk.summary is None
+                        ]
+                        for chunk in unsummarized:
+                            # Already stored; queued chunks only need their text
+                            chunk.embedding = None
+                        summary_queue.put_nowait(unsummarized)
+
+                except Exception as e:
+                    self.logger.error(f"Error during indexing: {e}")
                     return IndexResult(
                         success=False,
-                        chunks_indexed=0,
+                        chunks_indexed=chunks_indexed,
                         duration=time.time() - start_time,
-                        message=f"Invalid path: {actual_path}. Must be a file or directory.",
+                        message=f"Error during indexing: {str(e)}",
                     )
+                finally:
+                    producer.cancel()
+                    summary_queue.put_nowait(None)
 
-            self.logger.info(f"Found {len(chunks)} code chunks")
+            self.logger.info(f"Stored {chunks_indexed} chunks in database")
             self.telemetry.update_chunk_count(
-                len(chunks), {"operation": "index", "repo": final_repo_url}
+                chunks_indexed, {"operation": "index", "repo": final_repo_url}
             )
 
-            if not chunks:
+            if not chunks_indexed:
                 return IndexResult(
                     success=False,
                     chunks_indexed=0,
@@ -231,115 +439,344 @@ class CodebaseService:
                     message="No code chunks found. Check repository path.",
                 )
 
-            # Convert to CodeChunk objects and generate embeddings
-            async with LLMClient(config=self.config) as client:
-                try:
-                    # Generate embeddings
-                    with self.telemetry.trace_operation(
-                        "generate_embeddings", {"chunk_count": len(chunks)}
-                    ):
-                        embedding_start = time.time()
-                        contents = [chunk.content for chunk in chunks]
-                        self.logger.info("Generating embeddings...")
-                        embeddings = []
-                        batch_size = self.config.embedding_batch_size
-                        for i in range(0, len(contents), batch_size):
-                            batch = contents[i : i + batch_size]
-                            try:
-                                batch_embeddings = await client.embed_batch(batch)
-                                embeddings.extend(batch_embeddings)
-                                self.logger.debug(
-                                    f"Generated {len(embeddings)} embeddings so far."
-                                )
-                            except Exception as e:
-                                self.logger.error(
-                                    f"Failed to generate embeddings for batch {i//batch_size + 1}: {e}"
-                                )
-                                # If it's a connection error, provide helpful guidance
-                                if (
-                                    "connection" in str(e).lower()
-                                    or "network" in str(e).lower()
-                                ):
-                                    self.logger.error(
-                                        "This appears to be a network/connection issue."
-                                    )
-                                    self.logger.error(
-                                        "If using HuggingFace models, ensure you have internet access for model download."
-                                    )
-                                    self.logger.error(
-                                        "Consider using a local embedding service or OpenAI-compatible API instead."
-                                    )
-                                raise e
-
-                        embedding_duration = time.time() - embedding_start
-                        self.telemetry.record_embedding_duration(
-                            embedding_duration, {"chunk_count": len(chunks)}
-                        )
+            # Drop chunks whose content no longer exists in the indexed scope;
+            # a subdirectory cannot be told apart from the rest by payload
+            if not subdirectory_only:
+                file_path = str(path) if single_file else None
+                if not self.database.delete_stale_chunks(
+                    final_repo_url, indexed_hashes, file_path
+                ):
+                    self.logger.warning("Failed to delete stale chunks")
 
-                    self.logger.info(f"Generated {len(embeddings)} embeddings")
+            try:
+                self.database.set_index_state(final_repo_url, state_hash)
+            except Exception as e:
+                self.logger.warning(f"Failed to record index state: {e}")
 
-                    # Convert to CodeChunk objects with embeddings
-                    code_chunks = []
-                    for i, chunk in enumerate(chunks):
-                        content_hash = self._content_hash(chunk.content)
+            # Cached search results may point at chunks that changed
+            _clear_query_cache()
 
-                        # Add repository metadata
-                        metadata = {
-                            "parent_name": chunk.parent_name,
-                            "parent_type": chunk.parent_type,
-                            "full_signature": chunk.full_signature,
-                            "repo_url": final_repo_url,
-                        }
+            duration = time.time() - start_time
+            return IndexResult(
+                success=True,
+                chunks_indexed=chunks_indexed,
+                duration=duration,
+                message=f"Successfully indexed {chunks_indexed} chunks",
+            )
 
-                        code_chunk = CodeChunk(
-                            content_hash=content_hash,
-                            content=chunk.content,
-                            chunk_type=chunk.chunk_type,
-                            file_path=chunk.file_path,
-                            language=chunk.language,
-                            name=chunk.name or "",
-                            start_line=chunk.start_line,
-                            end_line=chunk.end_line,
-                            embedding=embeddings[i] if i < len(embeddings) else None,
-                            metadata=metadata,
-                        )
-                        code_chunks.append(code_chunk)
+    def _repository_state_hash(
+        self,
+        chunker: TreeSitterChunker,
+        path: Path,
+        single_file: bool,
+        chunking_config: ChunkingConfig,
+    ) -> str:
+        """
+        Fingerprint the files to index together with the settings that shape them.
 
-                    # Store in database
-                    with self.telemetry.trace_operation("store_chunks"):
-                        success = self.database.store_code_chunks(
-                            final_repo_url, code_chunks
-                        )
+        Files are identified by path, modification time and size, so nothing is
+        read; any edit, addition or removal, committed or not, changes the hash.
 
-                        if not success:
-                            return IndexResult(
-                                success=False,
-                                chunks_indexed=0,
-                                duration=time.time() - start_time,
-                                message="Failed to store chunks in database",
-                            )
+        Args:
+            chunker: Chunker deciding which files of a directory are indexed
+            path: File or directory being indexed
+            single_file: Whether path is a single file
+            chunking_config: Chunk size settings used for this index
 
-                    self.logger.info(f"Stored {len(code_chunks)} chunks in database")
+        Returns:
+            SHA-256 hex digest of the repository state
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            f"{self.config.embedding.model_name}:{chunking_config.max_chunk_size}:"
+            f"{chunking_config.min_chunk_size}:{chunking_config.overlap_size}:"
+            f"{path}\n".encode("utf-8")
+        )
+
+        files = [path] if single_file else chunker.iter_source_files(str(path))
+        entries = []
+        for file_path in files:
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            entries.append(f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}\n")
+
+        for entry in sorted(entries):
+            digest.update(entry.encode("utf-8"))
+        return digest.hexdigest()
+
+    async def _produce_chunk_batches(
+        self, chunk_iter: Iterator[Any], batches: asyncio.Queue
+    ):
+        """
+        Extract and hash chunk batches in a worker thread, feeding the queue.
+
+        A None sentinel marks the end of the chunks, including when
+        extraction fails part way through.
+
+        Args:
+            chunk_iter: Chunks as produced by the chunker
+            batches: Queue receiving (chunks, content hashes) batches
+        """
+        try:
+            while batch := await asyncio.to_thread(_take_hashed_batch, chunk_iter):
+                await batches.put(batch)
+        except Exception as e:
+            self.logger.error(f"Error extracting chunks: {e}")
+        await batches.put(None)
+
+    async def _index_chunk_batch(
+        self,
+        client: LLMClient,
+        chunks: List[Any],
+        content_hashes: List[str],
+        repo_url: str,
+    ) -> Optional[List[CodeChunk]]:
+        """
+        Embed and store one batch of extracted chunks.
+
+        Chunks already stored keep their vector and summary and are not written
+        again, apart from the location of those that moved. New chunks are
+        stored without a summary and summarized later by _summarize_in_background.
 
-                    # Generate summaries
+        Args:
+            client: Client used to create the embeddings
+            chunks: Chunks from the chunker
+            content_hashes: SHA-256 of each chunk's content, in the same order
+            repo_url: Repository the chunks belong to
+
+        Returns:
+            The batch's chunks, with an embedding only for the new ones, or
+            None if storing them failed
+        """
+        # Chunks stored by an earlier index with the same model keep their
+        # embedding and summary; only new content is embedded and summarized
+        model = self.config.embedding.model_name
+        stored = {
+            content_hash: payload
+            for content_hash, payload in self.database.get_stored_chunks(
+                repo_url, content_hashes
+            ).items()
+            if payload.get("embedding_model") == model
+        }
+        new_indices = [
+            i
+            for i, content_hash in enumerate(content_hashes)
+            if content_hash not in stored
+        ]
+
+        # Generate embeddings
+        with self.telemetry.trace_operation(
+            "generate_embeddings", {"chunk_count": len(new_indices)}
+        ):
+            embedding_start = time.time()
+            new_embeddings = await self._embed_with_cache(
+                client,
+                [chunks[i].content for i in new_indices],
+                [content_hashes[i] for i in new_indices],
+            )
+
+            embedding_duration = time.time() - embedding_start
+            self.telemetry.record_embedding_duration(
+                embedding_duration, {"chunk_count": len(new_indices)}
+            )
+
+        self.logger.debug(
+            f"Generated {len(new_embeddings)} embeddings, "
+            f"reused {len(chunks) - len(new_indices)} stored chunks"
+        )
+        embeddings = [None] * len(chunks)
+        for i, embedding in zip(new_indices, new_embeddings):
+            embeddings[i] = embedding
+
+        # Convert to CodeChunk objects with embeddings; the repository
+        # metadata is the same for every chunk of the batch
+        repo_metadata = {"repo_url": repo_url, "embedding_model": model}
+        code_chunks = []
+        for chunk, content_hash, embedding in zip(chunks, content_hashes, embeddings):
+            code_chunks.append(
+                CodeChunk(
+                    content_hash=content_hash,
+                    content=chunk.content,
+                    chunk_type=chunk.chunk_type,
+                    file_path=chunk.file_path,
+                    language=chunk.language,
+                    name=chunk.name or "",
+                    start_line=chunk.start_line,
+                    end_line=chunk.end_line,
+                    embedding=embedding,
+                    summary=stored.get(content_hash, {}).get("summary"),
+                    metadata={
+                        "parent_name": chunk.parent_name,
+                        "parent_type": chunk.parent_type,
+                        "full_signature": chunk.full_signature,
+                        **repo_metadata,
+                    },
+                )
+            )
+
+        # Store the new chunks; reused ones already have their vectors stored
+        new_chunks = [code_chunks[i] for i in new_indices]
+        reused_chunks = [chunk for chunk in code_chunks if chunk.content_hash in stored]
+        with self.telemetry.trace_operation("store_chunks"):
+            if new_chunks and not self.database.store_code_chunks(repo_url, new_chunks):
+                return None
+            if reused_chunks and not self.database.reuse_stored_chunks(
+                repo_url, reused_chunks, stored
+            ):
+                return None
+
+        self.logger.debug(
+            f"Stored {len(new_chunks)} new chunks, kept {len(reused_chunks)}"
+        )
+        return code_chunks
+
+    async def _summarize_in_background(
+        self, repo_url: str, summary_queue: asyncio.Queue
+    ):
+        """
+        Summarize stored chunks as batches are queued, saving each batch's summaries.
+
+        Uses its own client, since it keeps running after index_repository has
+        returned. A None sentinel marks the end of the batches.
+
+        Args:
+            repo_url: Repository the chunks belong to
+            summary_queue: Queue receiving lists of stored chunks without summary
+        """
+        summarized = 0
+        try:
+            async with LLMClient(config=self.config) as client:
+                while (code_chunks := await summary_queue.get()) is not None:
+                    if not code_chunks:
+                        continue
                     await self._generate_summaries(code_chunks, client)
+                    if self.database.update_chunk_summaries(repo_url, code_chunks):
+                        summarized += sum(1 for chunk in code_chunks if chunk.summary)
+                    else:
+                        self.logger.warning("Failed to save chunk summaries")
+        except Exception as e:
+            self.logger.error(f"Error summarizing chunks of {repo_url}: {e}")
 
-                    duration = time.time() - start_time
-                    return IndexResult(
-                        success=True,
-                        chunks_indexed=len(code_chunks),
-                        duration=duration,
-                        message=f"Successfully indexed {len(code_chunks)} chunks",
-                    )
+        # Cached results were built before the summaries existed
+        if summarized:
+            _clear_query_cache()
+        self.logger.info(f"Saved {summarized} chunk summaries for {repo_url}")
 
-                except Exception as e:
-                    self.logger.error(f"Error during indexing: {e}")
-                    return IndexResult(
-                        success=False,
-                        chunks_indexed=0,
-                        duration=time.time() - start_time,
-                        message=f"Error during indexing: {str(e)}",
+    async def _embed_with_cache(
+        self, client: LLMClient, contents: List[str], content_hashes: List[str]
+    ) -> List[List[float]]:
+        """
+        Embed contents, reusing cached embeddings of unchanged content.
+
+        Args:
+            client: Client used to embed contents missing from the cache
+            contents: Texts to embed
+            content_hashes: SHA-256 of each content, in the same order
+
+        Returns:
+            One embedding per content, in the same order
+        """
+        cache = self._get_embedding_cache()
+        if cache is None:
+            return await self._embed_in_batches(client, contents)
+
+        model = self.config.embedding.model_name
+        try:
+            cached = cache.get_many(model, content_hashes)
+        except Exception as e:
+            self.logger.warning(f"Embedding cache lookup failed: {e}")
+            cached = {}
+
+        # Embed each distinct uncached content once
+        missing = {}
+        for content_hash, content in zip(content_hashes, contents):
+            if content_hash not in cached:
+                missing.setdefault(content_hash, content)
+        self.logger.debug(
+            f"Reusing {len(contents) - len(missing)} cached embeddings, "
+            f"embedding {len(missing)} new contents"
+        )
+
+        if missing:
+            new_embeddings = await self._embed_in_batches(
+                client, list(missing.values())
+            )
+            fresh = dict(zip(missing, new_embeddings))
+            try:
+                cache.put_many(model, fresh.items())
+            except Exception as e:
+                self.logger.warning(f"Failed to update embedding cache: {e}")
+            cached.update(fresh)
+
+        return [cached[content_hash] for content_hash in content_hashes]
+
+    async def _embed_in_batches(
+        self, client: LLMClient, contents: List[str]
+    ) -> List[List[float]]:
+        """
+        Embed contents in batches, sending the batches concurrently.
+
+        Contents are batched in order of length, so each batch is padded to a
+        similar length. The client's request semaphore bounds how many batches
+        are in flight; results are written back by position so they stay in
+        content order.
+
+        Args:
+            client: Client used to create the embeddings
+            contents: Texts to embed
+
+        Returns:
+            One embedding per content, in the same order
+        """
+        batch_size = self.config.embedding_batch_size
+        embeddings: List[Optional[List[float]]] = [None] * len(contents)
+        order = sorted(range(len(contents)), key=lambda i: len(contents[i]))
+        completed = 0
+
+        async def embed_batch(start: int):
+            nonlocal completed
+            positions = order[start : start + batch_size]
+            batch = [contents[i] for i in positions]
+            try:
+                batch_embeddings = await client.embed_batch(batch)
+                if len(batch_embeddings) != len(batch):
+                    raise ValueError(
+                        f"Got {len(batch_embeddings)} embeddings for {len(batch)} texts"
                     )
+                for position, embedding in zip(positions, batch_embeddings):
+                    embeddings[position] = embedding
+                completed += len(batch)
+                self.logger.debug(f"Generated {completed} embeddings so far.")
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to generate embeddings for batch {start//batch_size + 1}: {e}"
+                )
+                # If it's a connection error, provide helpful guidance
+                if "connection" in str(e).lower() or "network" in str(e).lower():
+                    self.logger.error("This appears to be a network/connection issue.")
+                    self.logger.error(
+                        "If using HuggingFace models, ensure you have internet access for model download."
+                    )
+                    self.logger.error(
+                        "Consider using a local embedding service or OpenAI-compatible API instead."
+                    )
+                raise
+
+        tasks = [
+            asyncio.create_task(embed_batch(start))
+            for start in range(0, len(contents), batch_size)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            # Every embedding is needed, so stop the batches still queued
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return embeddings
 
     async def search_codebase(
         self,
@@ -364,8 +801,21 @@ class CodebaseService:
 
         async with LLMClient(config=self.config) as client:
             try:
-                # Generate embedding for the query
-                query_embedding = await client.embed(query)
+                # Generate embedding for the query; repeated queries are cached
+                query_embedding = await client.embed_query(query)
+
+                # Near-duplicate queries with the same parameters share results
+                query_cache = self._get_query_cache()
+                scope = (repo_filter, max_results, score_threshold)
+                if query_cache is not None:
+                    cached_chunks = query_cache.lookup(query_embedding, scope)
+                    if cached_chunks is not None:
+                        return SearchResult(
+                            chunks=list(cached_chunks),
+                            total_results=len(cached_chunks),
+                            duration=time.time() - start_time,
+                            query=query,
+                        )
 
                 # Search in database
                 search_results = self.database.search_similar_code(
@@ -376,22 +826,17 @@ class CodebaseService:
                 )
 
                 # Convert to response format
-                chunks = []
-                for result in search_results:
-                    chunks.append(
-                        {
-                            "content": result.content,
-                            "file_path": result.metadata.get("file_path", ""),
-                            "chunk_type": result.metadata.get("chunk_type", ""),
-                            "name": result.metadata.get("name", ""),
-                            "start_line": result.metadata.get("start_line", 0),
-                            "end_line": result.metadata.get("end_line", 0),
-                            "language": result.metadata.get("language", ""),
-                            "summary": result.metadata.get("summary"),
-                            "score": result.score,
-                            "repo_url": result.metadata.get("repo_url"),
-                        }
-                    )
+                chunks = [
+                    {
+                        "content": result.content,
+                        **_metadata_fields(result.metadata, SEARCH_RESULT_FIELDS),
+                        "score": result.score,
+                    }
+                    for result in search_results
+                ]
+
+                if query_cache is not None:
+                    query_cache.store(query_embedding, scope, chunks)
 
                 duration = time.time() - start_time
 
@@ -424,8 +869,8 @@ class CodebaseService:
 
         async with LLMClient(config=self.config) as client:
             try:
-                # Generate embedding for the query
-                query_embedding = await client.embed(query)
+                # Generate embedding for the query; repeated queries are cached
+                query_embedding = await client.embed_query(query)
 
                 # Search for relevant code chunks
                 search_results = self.database.search_similar_code(
@@ -462,21 +907,15 @@ class CodebaseService:
                 # Format context chunks for response
                 context_chunks = []
                 for result in reranked_results:
-                    chunk_data = result.result
+                    content = result.result.content
+                    metadata = result.result.metadata
+                    if len(content) > CONTEXT_PREVIEW_CHARS:
+                        content = content[:CONTEXT_PREVIEW_CHARS] + "..."
                     context_chunks.append(
                         {
-                            "content": (
-                                chunk_data.content[:500] + "..."
-                                if len(chunk_data.content) > 500
-                                else chunk_data.content
-                            ),
-                            "file_path": chunk_data.metadata.get("file_path", ""),
-                            "chunk_type": chunk_data.metadata.get("chunk_type", ""),
-                            "name": chunk_data.metadata.get("name", ""),
-                            "start_line": chunk_data.metadata.get("start_line", 0),
-                            "end_line": chunk_data.metadata.get("end_line", 0),
+                            "content": content,
+                            **_metadata_fields(metadata, CHAT_CONTEXT_FIELDS),
                             "score": result.score,
-                            "repo_url": chunk_data.metadata.get("repo_url"),
                         }
                     )
 
@@ -496,10 +935,10 @@ class CodebaseService:
     async def _generate_summaries(
         self, code_chunks: List[CodeChunk], client: LLMClient
     ):
-        """Generate summaries for code chunks."""
+        """Generate summaries for code chunks, setting each chunk's summary."""
         try:
             with self.telemetry.trace_operation("generate_summaries"):
-                self.logger.info("Generating code summaries...")
+                self.logger.debug("Generating code summaries...")
 
                 # Create a temporary knowledge graph for summarization
                 from graph_engine.knowledge_graph import KnowledgeGraph
@@ -531,7 +970,7 @@ class CodebaseService:
 
                 if chunk_hashes:
                     summaries = await summarizer.summarize_chunks_batch(chunk_hashes)
-                    self.logger.info(f"Generated {len(summaries)} code summaries")
+                    self.logger.debug(f"Generated {len(summaries)} code summaries")
 
                     # Update chunks with summaries
                     for chunk in code_chunks:
@@ -544,11 +983,6 @@ class CodebaseService:
                                 if len(lines) > 1:
                                     summary_text = lines[1].strip()
                             chunk.summary = summary_text
-
-                    # Re-store chunks with summaries
-                    success = self.database.store_code_chunks(code_chunks)
-                    if not success:
-                        self.logger.warning("Failed to update chunks with summaries")
                 else:
                     self.logger.info("No chunks found to summarize")
 
@@ -596,4 +1030,6 @@ class CodebaseService:
 
     def delete_repository(self, repo_url: str) -> bool:
         """Delete a repository and all its data."""
-        return self.database.delete_repository(repo_url)
+        deleted = self.database.delete_repository(repo_url)
+        _clear_query_cache()
+        return deleted
@@ -4,15 +4,32 @@ This is the main database interface that natively supports multiple repositories
 """
 
 import hashlib
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from dataclasses import dataclass
 from urllib.parse import urlparse
+from qdrant_client import QdrantClient
 from storage.vector_store import QdrantVectorStore, VectorSearchResult
 from storage.graph_store import Neo4jGraphStore, GraphNode
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Payload fields needed to reuse a stored chunk instead of embedding it again,
+# and to tell whether it has moved since it was stored
+STORED_CHUNK_FIELDS = (
+    "summary",
+    "embedding_model",
+    "chunk_type",
+    "file_path",
+    "language",
+    "name",
+    "start_line",
+    "end_line",
+    "parent_name",
+    "parent_type",
+    "full_signature",
+)
+
 
 @dataclass
 class CodeChunk:
@@ -39,6 +56,23 @@ class RepositoryInfo:
     chunk_count: int
     collection_name: str  # Qdrant collection name
     graph_label: str  # Neo4j label for isolation
+    state_hash: str = ""  # Fingerprint of the files at the last complete index
+
+
+def _chunk_properties(chunk: CodeChunk, repo_url: str, repo_id: str) -> Dict[str, Any]:
+    """Payload describing a chunk, shared by the vector and graph stores."""
+    return {
+        "chunk_type": chunk.chunk_type,
+        "file_path": chunk.file_path,
+        "language": chunk.language,
+        "name": chunk.name,
+        "start_line": chunk.start_line,
+        "end_line": chunk.end_line,
+        "summary": chunk.summary,
+        "repo_url": repo_url,
+        "repo_id": repo_id,
+        **(chunk.metadata or {}),
+    }
 
 
 class CodeMindDatabase:
@@ -136,9 +170,13 @@ class CodeMindDatabase:
         repo_id = self._get_repo_identifier(repo_url)
 
         if repo_id not in self._graph_stores:
-            # Use same Neo4j instance but with repository-specific operations
+            # Same Neo4j instance, so share the main store's connection pool
+            # instead of opening another driver per repository
             self._graph_stores[repo_id] = Neo4jGraphStore(
-                self.neo4j_uri, self.neo4j_user, self.neo4j_password
+                self.neo4j_uri,
+                self.neo4j_user,
+                self.neo4j_password,
+                driver=self.main_graph_store.driver,
             )
             logger.info(f"Created graph store for repository: {repo_id}")
 
@@ -163,7 +201,8 @@ class CodeMindDatabase:
                 r.collection_name = $collection_name,
                 r.graph_label = $graph_label,
                 r.indexed_at = datetime(),
-                r.chunk_count = 0
+                r.chunk_count = 0,
+                r.state_hash = null
             RETURN r
             """
 
@@ -212,18 +251,7 @@ class CodeMindDatabase:
                             "content_hash": repo_content_hash,
                             "vector": chunk.embedding,
                             "content": chunk.content,
-                            "metadata": {
-                                "chunk_type": chunk.chunk_type,
-                                "file_path": chunk.file_path,
-                                "language": chunk.language,
-                                "name": chunk.name,
-                                "start_line": chunk.start_line,
-                                "end_line": chunk.end_line,
-                                "summary": chunk.summary,
-                                "repo_url": repo_url,
-                                "repo_id": repo_id,
-                                **(chunk.metadata or {}),
-                            },
+                            "metadata": _chunk_properties(chunk, repo_url, repo_id),
                         }
                     )
 
@@ -240,16 +268,7 @@ class CodeMindDatabase:
                             "content_hash": repo_content_hash,
                             "original_hash": chunk.content_hash,
                             "content": chunk.content,
-                            "chunk_type": chunk.chunk_type,
-                            "file_path": chunk.file_path,
-                            "language": chunk.language,
-                            "name": chunk.name,
-                            "start_line": chunk.start_line,
-                            "end_line": chunk.end_line,
-                            "summary": chunk.summary,
-                            "repo_url": repo_url,
-                            "repo_id": repo_id,
-                            **(chunk.metadata or {}),
+                            **_chunk_properties(chunk, repo_url, repo_id),
                         },
                     )
                 )
@@ -261,7 +280,7 @@ class CodeMindDatabase:
 
             graph_success = graph_store.store_nodes(graph_nodes)
 
-            # Update repository chunk count
+            # Count the stored chunks towards the repository total
             if vector_success and graph_success:
                 self._update_repository_stats(repo_url, len(chunks))
 
@@ -271,6 +290,166 @@ class CodeMindDatabase:
             logger.error(f"Error storing code chunks for {repo_url}: {e}")
             return False
 
+    def get_stored_chunks(
+        self, repo_url: str, content_hashes: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up which chunks are already stored for a repository.
+
+        Args:
+            repo_url: Repository URL
+            content_hashes: Content hashes of the chunks to look up
+
+        Returns:
+            Payload limited to STORED_CHUNK_FIELDS by content hash, for the
+            stored chunks
+        """
+        repo_id = self._get_repo_identifier(repo_url)
+        prefix = f"{repo_id}_"
+        payloads = self._get_vector_store(repo_url).get_payloads(
+            [prefix + content_hash for content_hash in content_hashes],
+            STORED_CHUNK_FIELDS,
+        )
+        return {key[len(prefix) :]: payload for key, payload in payloads.items()}
+
+    def reuse_stored_chunks(
+        self,
+        repo_url: str,
+        chunks: List[CodeChunk],
+        stored: Dict[str, Dict[str, Any]],
+    ) -> bool:
+        """
+        Keep chunks found again by an index without writing their vectors again.
+
+        Only the payload of chunks whose location changed is updated.
+
+        Args:
+            repo_url: Repository URL
+            chunks: Chunks that are already stored
+            stored: Stored payloads by content hash, from get_stored_chunks
+
+        Returns:
+            True if the moved chunks were updated in both stores
+        """
+        try:
+            repo_id = self._get_repo_identifier(repo_url)
+            moved = {}
+            for chunk in chunks:
+                properties = _chunk_properties(chunk, repo_url, repo_id)
+                payload = stored[chunk.content_hash]
+                if any(
+                    payload.get(field) != properties.get(field)
+                    for field in STORED_CHUNK_FIELDS
+                ):
+                    moved[f"{repo_id}_{chunk.content_hash}"] = properties
+
+            vector_success = True
+            if moved:
+                vector_success = self._get_vector_store(repo_url).set_payloads(moved)
+                with self._get_graph_store(repo_url).driver.session() as session:
+                    session.run(
+                        f"UNWIND $rows AS row MATCH (n:Repo_{repo_id} {{id: row.id}}) "
+                        "SET n += row.properties",
+                        rows=[
+                            {"id": key, "properties": properties}
+                            for key, properties in moved.items()
+                        ],
+                    )
+                logger.debug(f"Updated the location of {len(moved)} moved chunks")
+
+            # Reused chunks count towards the repository total like stored ones
+            if vector_success:
+                self._update_repository_stats(repo_url, len(chunks))
+
+            return vector_success
+
+        except Exception as e:
+            logger.error(f"Error reusing stored chunks for {repo_url}: {e}")
+            return False
+
+    def update_chunk_summaries(self, repo_url: str, chunks: List[CodeChunk]) -> bool:
+        """
+        Save summaries generated after the chunks were stored.
+
+        Args:
+            repo_url: Repository URL
+            chunks: Stored chunks, with their summary set
+
+        Returns:
+            True if the summaries were saved in both stores
+        """
+        try:
+            repo_id = self._get_repo_identifier(repo_url)
+            summaries = {
+                f"{repo_id}_{chunk.content_hash}": chunk.summary
+                for chunk in chunks
+                if chunk.summary
+            }
+            if not summaries:
+                return True
+
+            vector_success = self._get_vector_store(repo_url).set_payloads(
+                {key: {"summary": summary} for key, summary in summaries.items()}
+            )
+
+            with self._get_graph_store(repo_url).driver.session() as session:
+                session.run(
+                    f"UNWIND $rows AS row MATCH (n:Repo_{repo_id} {{id: row.id}}) "
+                    "SET n.summary = row.summary",
+                    rows=[
+                        {"id": key, "summary": summary}
+                        for key, summary in summaries.items()
+                    ],
+                )
+
+            return vector_success
+
+        except Exception as e:
+            logger.error(f"Error updating chunk summaries for {repo_url}: {e}")
+            return False
+
+    def delete_stale_chunks(
+        self,
+        repo_url: str,
+        content_hashes: Iterable[str],
+        file_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Delete the stored chunks of a repository that are no longer present.
+
+        Args:
+            repo_url: Repository URL
+            content_hashes: Content hashes of the chunks to keep
+            file_path: Only delete chunks of this file
+
+        Returns:
+            True if the stale chunks were deleted from both stores
+        """
+        try:
+            repo_id = self._get_repo_identifier(repo_url)
+            keep = [f"{repo_id}_{content_hash}" for content_hash in content_hashes]
+            filters = {"file_path": file_path} if file_path else None
+
+            vector_success = self._get_vector_store(repo_url).delete_except(
+                keep, filters
+            )
+
+            query = (
+                f"MATCH (n:Repo_{repo_id}) "
+                "WHERE n.content_hash IS NOT NULL AND NOT n.content_hash IN $keep "
+            )
+            if file_path:
+                query += "AND n.file_path = $file_path "
+            query += "DETACH DELETE n"
+            with self._get_graph_store(repo_url).driver.session() as session:
+                session.run(query, keep=keep, file_path=file_path)
+
+            return vector_success
+
+        except Exception as e:
+            logger.error(f"Error deleting stale chunks for {repo_url}: {e}")
+            return False
+
     def search_similar_code(
         self,
         query_embedding: List[float],
@@ -280,7 +459,8 @@ class CodeMindDatabase:
     ) -> List[VectorSearchResult]:
         """Search for similar code, optionally filtered by repository."""
         if repo_url:
-            # Search in specific repository
+            # Each repository has its own collection, so no repo_url payload
+            # filter is needed to keep other repositories out of the search
             vector_store = self._get_vector_store(repo_url)
             return vector_store.search_similar(
                 query_embedding, limit, None, score_threshold
@@ -306,6 +486,53 @@ class CodeMindDatabase:
             all_results.sort(key=lambda x: x.score, reverse=True)
             return all_results[:limit]
 
+    def search_similar_code_batch(
+        self,
+        query_embeddings: List[List[float]],
+        repo_url: Optional[str] = None,
+        limit: int = 10,
+        score_threshold: float = 0.7,
+    ) -> List[VectorSearchResult]:
+        """
+        Search with several query embeddings at once and merge the results.
+
+        Each repository is searched with one batched request. Chunks found by
+        more than one query are kept once, with their best score.
+
+        Args:
+            query_embeddings: Query embeddings to search with
+            repo_url: Optional repository to restrict the search to
+            limit: Maximum number of merged results
+            score_threshold: Minimum similarity score
+
+        Returns:
+            Merged results sorted by score
+        """
+        if repo_url:
+            repo_urls = [repo_url]
+        else:
+            repo_urls = [repo_info.repo_url for repo_info in self.list_repositories()]
+
+        best: Dict[str, VectorSearchResult] = {}
+        for url in repo_urls:
+            try:
+                vector_store = self._get_vector_store(url)
+                batches = vector_store.search_similar_batch(
+                    query_embeddings, limit, None, score_threshold
+                )
+            except Exception as e:
+                logger.warning(f"Error searching in {url}: {e}")
+                continue
+
+            for results in batches:
+                for result in results:
+                    current = best.get(result.content_hash)
+                    if current is None or result.score > current.score:
+                        best[result.content_hash] = result
+
+        merged = sorted(best.values(), key=lambda x: x.score, reverse=True)
+        return merged[:limit]
+
     def list_repositories(self) -> List[RepositoryInfo]:
         with self.main_graph_store.driver.session() as session:
             query = """
@@ -313,7 +540,7 @@ class CodeMindDatabase:
             RETURN r.repo_url as repo_url, r.repo_name as repo_name, 
                    r.owner as owner, r.branch as branch, r.indexed_at as indexed_at,
                    r.chunk_count as chunk_count, r.collection_name as collection_name,
-                   r.graph_label as graph_label
+                   r.graph_label as graph_label, r.state_hash as state_hash
             ORDER BY r.indexed_at DESC
             """
             result = session.run(query)
@@ -332,11 +559,57 @@ class CodeMindDatabase:
                         chunk_count=record["chunk_count"] or 0,
                         collection_name=record["collection_name"],
                         graph_label=record["graph_label"],
+                        state_hash=record["state_hash"] or "",
                     )
                 )
 
             return repositories
 
+    def get_index_state(self, repo_url: str) -> Optional[str]:
+        """
+        Get the state hash recorded by the last complete index of a repository.
+
+        Args:
+            repo_url: Repository URL
+
+        Returns:
+            The state hash, or None if the repository was never fully indexed
+            or its vector collection has since been removed
+        """
+        try:
+            with self.main_graph_store.driver.session() as session:
+                record = session.run(
+                    "MATCH (r:Repository {repo_url: $repo_url}) "
+                    "RETURN r.state_hash AS state_hash, "
+                    "r.collection_name AS collection_name",
+                    repo_url=repo_url,
+                ).single()
+            if not record or not record["state_hash"]:
+                return None
+
+            # Checked through a plain client; a vector store would create it
+            client = QdrantClient(host=self.qdrant_host, port=self.qdrant_port)
+            try:
+                if not client.collection_exists(record["collection_name"]):
+                    return None
+            finally:
+                client.close()
+            return record["state_hash"]
+
+        except Exception as e:
+            logger.warning(f"Error reading index state for {repo_url}: {e}")
+            return None
+
+    def set_index_state(self, repo_url: str, state_hash: str):
+        """Record the state hash of a repository that was indexed completely."""
+        with self.main_graph_store.driver.session() as session:
+            session.run(
+                "MATCH (r:Repository {repo_url: $repo_url}) "
+                "SET r.state_hash = $state_hash",
+                repo_url=repo_url,
+                state_hash=state_hash,
+            )
+
     def delete_repository(self, repo_url: str) -> bool:
         try:
             repo_id = self._get_repo_identifier(repo_url)
@@ -377,6 +650,52 @@ class CodeMindDatabase:
             logger.error(f"Error deleting repository {repo_url}: {e}")
             return False
 
+    def delete_all_repositories(self) -> int:
+        """
+        Delete every repository, its collection, graph nodes and record.
+
+        Graph data is removed in one transaction instead of one per repository.
+
+        Returns:
+            Number of repositories deleted
+        """
+        try:
+            repositories = self.list_repositories()
+
+            # Delete Qdrant collections through one client; opening a vector
+            # store per repository would first create any missing collection
+            client = QdrantClient(host=self.qdrant_host, port=self.qdrant_port)
+            for repo_info in repositories:
+                collection_name = repo_info.collection_name
+                try:
+                    client.delete_collection(collection_name)
+                    logger.info(f"Deleted Qdrant collection: {collection_name}")
+                except Exception as e:
+                    logger.warning(f"Error deleting Qdrant collection: {e}")
+            client.close()
+
+            # Delete all repository-labelled nodes and repository metadata
+            with self.main_graph_store.driver.session() as session:
+                with session.begin_transaction() as tx:
+                    tx.run(
+                        "MATCH (n) WHERE any(label IN labels(n) "
+                        "WHERE label STARTS WITH 'Repo_') DETACH DELETE n"
+                    )
+                    tx.run("MATCH (r:Repository) DETACH DELETE r")
+                    tx.commit()
+
+            self._vector_stores.clear()
+            for store in self._graph_stores.values():
+                store.close()
+            self._graph_stores.clear()
+
+            logger.info(f"Deleted {len(repositories)} repositories")
+            return len(repositories)
+
+        except Exception as e:
+            logger.error(f"Error deleting repositories: {e}")
+            return 0
+
     def get_repository_stats(self, repo_url: str) -> Dict[str, Any]:
         try:
             vector_store = self._get_vector_store(repo_url)
@@ -416,10 +735,12 @@ class CodeMindDatabase:
             return {}
 
     def _update_repository_stats(self, repo_url: str, chunk_count: int):
+        """Add newly stored chunks to the count reset by register_repository."""
         with self.main_graph_store.driver.session() as session:
             query = """
             MATCH (r:Repository {repo_url: $repo_url})
-            SET r.chunk_count = $chunk_count, r.indexed_at = datetime()
+            SET r.chunk_count = coalesce(r.chunk_count, 0) + $chunk_count,
+                r.indexed_at = datetime()
             """
             session.run(query, repo_url=repo_url, chunk_count=chunk_count)
 
@@ -0,0 +1,95 @@
+"""
+On-disk cache of chunk embeddings keyed by embedding model and content hash.
+
+Re-indexing a repository only needs to embed chunks whose content changed;
+every other vector is read back from here instead of calling the model.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the stored vectors change meaning so old caches are discarded
+CACHE_SCHEMA_VERSION = 1
+
+# Content hashes per SELECT, below SQLite's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """SQLite-backed store of float16 embeddings keyed by model and content."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self):
+        """Create the table, dropping caches written by another schema version."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS embeddings")
+            self._conn.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, content_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def get_many(
+        self, model: str, content_hashes: Sequence[str]
+    ) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings for content hashes.
+
+        Args:
+            model: Embedding model the vectors were created with
+            content_hashes: Hashes of the contents to look up
+
+        Returns:
+            Embeddings by content hash, for the hashes that are cached
+        """
+        found = {}
+        unique_hashes = list(dict.fromkeys(content_hashes))
+        for start in range(0, len(unique_hashes), LOOKUP_BATCH_SIZE):
+            batch = unique_hashes[start : start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                "SELECT content_hash, vector FROM embeddings "
+                f"WHERE model = ? AND content_hash IN ({placeholders})",
+                (model, *batch),
+            )
+            for content_hash, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float16)
+                found[content_hash] = vector.astype(np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, List[float]]]):
+        """Store embeddings as (content hash, vector) pairs for a model."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, content_hash, vector) "
+                "VALUES (?, ?, ?)",
+                (
+                    (model, content_hash, np.asarray(vector, np.float16).tobytes())
+                    for content_hash, vector in items
+                ),
+            )
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
@@ -37,13 +37,19 @@ class Neo4jGraphStore:
         uri: str = "bolt://localhost:7687",
         user: str = "neo4j",
         password: str = "turbo-review-password",
+        driver=None,
     ):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
-        self._ensure_constraints()
+        # A driver passed in is shared with its owner, who also closes it
+        self._owns_driver = driver is None
+        if driver is None:
+            self.driver = GraphDatabase.driver(uri, auth=(user, password))
+            self._ensure_constraints()
+        else:
+            self.driver = driver
 
     def close(self):
         """Close the database connection."""
-        if self.driver:
+        if self.driver and self._owns_driver:
             self.driver.close()
 
     def _ensure_constraints(self):
@@ -0,0 +1,111 @@
+"""
+In-memory cache of search results for near-duplicate queries.
+
+Query embeddings are kept in a FAISS inner-product index over normalized
+vectors, so a rephrased query close enough to an earlier one reuses its
+results instead of searching the vector database again.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Nearest cached queries checked for one searched with the same scope
+SCOPE_PROBE_SIZE = 8
+
+
+class SemanticQueryCache:
+    """Bounded LRU of query results, matched by cosine similarity of queries."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: int = 300,
+    ):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._index: Optional[faiss.IndexIDMap] = None
+        self._entries: "OrderedDict[int, Tuple[Hashable, Any, float]]" = OrderedDict()
+        self._next_id = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Unit-length row vector, so inner product is cosine similarity."""
+        vector = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def lookup(self, embedding: List[float], scope: Hashable) -> Optional[Any]:
+        """
+        Find the results of a similar earlier query searched with the same scope.
+
+        Args:
+            embedding: Embedding of the new query
+            scope: Search parameters the results must have been produced with
+
+        Returns:
+            The cached results, or None on a miss
+        """
+        if not self._entries or len(embedding) != self._index.d:
+            return None
+
+        probe = min(SCOPE_PROBE_SIZE, len(self._entries))
+        scores, ids = self._index.search(self._normalize(embedding), probe)
+        for score, entry_id in zip(scores[0], ids[0]):
+            # Neighbours come best first, so nothing further can match
+            if entry_id < 0 or score < self.similarity_threshold:
+                break
+
+            entry_id = int(entry_id)
+            entry_scope, results, stored_at = self._entries[entry_id]
+            # Expired entries are dropped whatever their scope, so they do not
+            # keep taking up the probed neighbours
+            if time.time() - stored_at > self.ttl_seconds:
+                self._remove(entry_id)
+                continue
+            if entry_scope != scope:
+                continue
+
+            self._entries.move_to_end(entry_id)
+            logger.debug(f"Query cache hit with similarity {score:.3f}")
+            return results
+
+        return None
+
+    def store(self, embedding: List[float], scope: Hashable, results: Any):
+        """Remember the results of a query, evicting the least recently used."""
+        if self._index is None or len(embedding) != self._index.d:
+            # A new embedding model invalidates everything cached so far
+            self._index = faiss.IndexIDMap(faiss.IndexFlatIP(len(embedding)))
+            self._entries.clear()
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._index.add_with_ids(
+            self._normalize(embedding), np.array([entry_id], dtype=np.int64)
+        )
+        self._entries[entry_id] = (scope, results, time.time())
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int):
+        """Drop one entry from the index and the LRU order."""
+        self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+        del self._entries[entry_id]
+        if not self._entries:
+            self._index = None
+
+    def clear(self):
+        """Forget all cached queries, e.g. after the indexed code changed."""
+        self._index = None
+        self._entries.clear()
@@ -0,0 +1,91 @@
+"""
+Cache of generated reviews, stored in Qdrant next to the code vectors.
+"""
+
+import hashlib
+import time
+from typing import List, Dict, Any, Optional
+
+from storage.vector_store import QdrantVectorStore
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReviewCache:
+    """Reviews per diff and repo, found by an exact key on the diff hash."""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6333,
+        collection_name: str = "review_cache",
+        ttl_seconds: int = 86400,
+    ):
+        self.store = QdrantVectorStore(
+            host=host,
+            port=port,
+            collection_name=collection_name,
+            payload_indexes=("diff_sha256", "repo_url"),
+        )
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def diff_hash(diff_content: str) -> str:
+        """Hash a diff so only reviews of the same change are reused."""
+        return hashlib.sha256(diff_content.encode()).hexdigest()
+
+    @staticmethod
+    def _entry_key(diff_sha256: str, repo_url: Optional[str]) -> str:
+        """Key of the single cached review for a diff in a repository."""
+        return f"{repo_url or ''}:{diff_sha256}"
+
+    def _fresh_payload(self, hit, diff_sha256: str) -> Optional[Dict[str, Any]]:
+        """Return a hit's review payload unless it has outlived the TTL."""
+        if time.time() - hit.metadata.get("created_at", 0) > self.ttl_seconds:
+            logger.debug(f"Cached review for diff {diff_sha256[:12]} expired")
+            return None
+        return {"review_content": hit.content, **hit.metadata}
+
+    def lookup_exact(
+        self, diff_sha256: str, repo_url: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a fresh cached review of the identical diff by key, without a search.
+
+        Args:
+            diff_sha256: Hash of the diff being reviewed
+            repo_url: Repository the review was generated against
+
+        Returns:
+            The cached review payload, or None on a miss
+        """
+        hit = self.store.get_by_hash(self._entry_key(diff_sha256, repo_url))
+        if hit is None:
+            return None
+        return self._fresh_payload(hit, diff_sha256)
+
+    def store_review(
+        self,
+        query_vector: List[float],
+        diff_sha256: str,
+        repo_url: Optional[str],
+        review_content: str,
+        metadata: Dict[str, Any],
+    ) -> bool:
+        """Store a generated review, replacing any earlier one for the diff."""
+        return self.store.store_vectors(
+            [
+                {
+                    "content_hash": self._entry_key(diff_sha256, repo_url),
+                    "vector": query_vector,
+                    "content": review_content,
+                    "metadata": {
+                        **metadata,
+                        "diff_sha256": diff_sha256,
+                        "repo_url": repo_url or "",
+                        "created_at": time.time(),
+                    },
+                }
+            ]
+        )
@@ -2,24 +2,52 @@
 Vector database interface using Qdrant for production-grade vector storage.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 import hashlib
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
+    Datatype,
     Distance,
     VectorParams,
     PointStruct,
     Filter,
     FieldCondition,
+    HasIdCondition,
     MatchValue,
+    PayloadSchemaType,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
     SearchRequest,
+    SetPayload,
+    SetPayloadOperation,
     UpdateStatus,
 )
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Payload fields filtered on by default; keyword indexes turn those filters
+# into index lookups instead of scans over every point's payload
+DEFAULT_PAYLOAD_INDEXES = ("chunk_type", "name", "file_path")
+
+# Searches traverse int8 copies of the vectors held in RAM, then rescore an
+# oversampled candidate set against the float16 originals kept on disk
+QUANTIZATION_CONFIG = ScalarQuantization(
+    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+)
+QUANTIZED_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+
+def _point_id(content_hash: str) -> int:
+    """Numeric Qdrant point ID derived from a content hash."""
+    return int(hashlib.sha256(content_hash.encode()).hexdigest()[:15], 16)
+
 
 @dataclass
 class VectorSearchResult:
@@ -39,9 +67,11 @@ class QdrantVectorStore:
         host: str = "localhost",
         port: int = 6333,
         collection_name: str = "turbo_review",
+        payload_indexes: Sequence[str] = DEFAULT_PAYLOAD_INDEXES,
     ):
         self.client = QdrantClient(host=host, port=port)
         self.collection_name = collection_name
+        self.payload_indexes = tuple(payload_indexes)
         self.vector_size = 768  # For microsoft/unixcoder-base model
 
         # Create collection if it doesn't exist
@@ -57,8 +87,13 @@ class QdrantVectorStore:
                 self.client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
-                        size=self.vector_size, distance=Distance.COSINE
+                        size=self.vector_size,
+                        distance=Distance.COSINE,
+                        on_disk=True,
+                        # Half the storage of float32; cosine ranking is unaffected
+                        datatype=Datatype.FLOAT16,
                     ),
+                    quantization_config=QUANTIZATION_CONFIG,
                 )
                 logger.info(f"Created Qdrant collection: {self.collection_name}")
             else:
@@ -68,6 +103,31 @@ class QdrantVectorStore:
             logger.error(f"Error setting up Qdrant collection: {e}")
             raise
 
+        self._ensure_payload_indexes()
+
+    def _ensure_payload_indexes(self):
+        """Create keyword indexes for the filtered payload fields that lack one."""
+        if not self.payload_indexes:
+            return
+
+        try:
+            info = self.client.get_collection(self.collection_name)
+            existing = set(info.payload_schema or {})
+            for field_name in self.payload_indexes:
+                if field_name in existing:
+                    continue
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=PayloadSchemaType.KEYWORD,
+                )
+                logger.info(
+                    f"Created payload index on {field_name} in {self.collection_name}"
+                )
+        except Exception as e:
+            # Filters still work without the index, just by scanning
+            logger.warning(f"Error creating payload indexes: {e}")
+
     def store_vectors(self, vectors_data: List[Dict[str, Any]]) -> bool:
         """
         Store vectors with metadata.
@@ -79,9 +139,7 @@ class QdrantVectorStore:
             points = []
             for data in vectors_data:
                 # Convert content_hash to numeric ID for Qdrant
-                numeric_id = int(
-                    hashlib.sha256(data["content_hash"].encode()).hexdigest()[:15], 16
-                )
+                numeric_id = _point_id(data["content_hash"])
 
                 point = PointStruct(
                     id=numeric_id,
@@ -126,41 +184,19 @@ class QdrantVectorStore:
             score_threshold: Minimum similarity score
         """
         try:
-            # Build filter conditions
-            filter_conditions = None
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    conditions.append(
-                        FieldCondition(key=key, match=MatchValue(value=value))
-                    )
-                if conditions:
-                    filter_conditions = Filter(must=conditions)
-
             # Perform search
             search_result = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
-                query_filter=filter_conditions,
+                query_filter=self._build_filter(filters),
+                search_params=QUANTIZED_SEARCH_PARAMS,
                 limit=limit,
                 score_threshold=score_threshold,
                 with_payload=True,
             )
 
             # Convert to our result format
-            results = []
-            for hit in search_result:
-                result = VectorSearchResult(
-                    content_hash=hit.payload["content_hash"],
-                    score=hit.score,
-                    metadata={
-                        k: v
-                        for k, v in hit.payload.items()
-                        if k not in ["content", "content_hash"]
-                    },
-                    content=hit.payload["content"],
-                )
-                results.append(result)
+            results = [self._to_search_result(hit) for hit in search_result]
 
             logger.debug(f"Found {len(results)} similar vectors")
             return results
@@ -169,11 +205,78 @@ class QdrantVectorStore:
             logger.error(f"Error searching vectors: {e}")
             return []
 
+    def search_similar_batch(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: float = 0.0,
+    ) -> List[List[VectorSearchResult]]:
+        """
+        Search for several query vectors in a single request.
+
+        Args:
+            query_vectors: Query embeddings
+            limit: Maximum results to return per query
+            filters: Optional metadata filters applied to every query
+            score_threshold: Minimum similarity score
+
+        Returns:
+            One result list per query vector, in the same order
+        """
+        try:
+            filter_conditions = self._build_filter(filters)
+            batch_result = self.client.search_batch(
+                collection_name=self.collection_name,
+                requests=[
+                    SearchRequest(
+                        vector=query_vector,
+                        filter=filter_conditions,
+                        params=QUANTIZED_SEARCH_PARAMS,
+                        limit=limit,
+                        score_threshold=score_threshold,
+                        with_payload=True,
+                    )
+                    for query_vector in query_vectors
+                ],
+            )
+
+            return [
+                [self._to_search_result(hit) for hit in hits] for hits in batch_result
+            ]
+
+        except Exception as e:
+            logger.error(f"Error batch searching vectors: {e}")
+            return [[] for _ in query_vectors]
+
+    def _build_filter(self, filters: Optional[Dict[str, Any]]) -> Optional[Filter]:
+        """Build an exact-match filter from metadata key/value pairs."""
+        if not filters:
+            return None
+
+        conditions = []
+        for key, value in filters.items():
+            conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
+        return Filter(must=conditions)
+
+    def _to_search_result(self, hit) -> VectorSearchResult:
+        """Convert a Qdrant hit to our result format."""
+        return VectorSearchResult(
+            content_hash=hit.payload["content_hash"],
+            score=hit.score,
+            metadata={
+                k: v
+                for k, v in hit.payload.items()
+                if k not in ["content", "content_hash"]
+            },
+            content=hit.payload["content"],
+        )
+
     def get_by_hash(self, content_hash: str) -> Optional[VectorSearchResult]:
         """Get vector data by content hash."""
         try:
             # Convert content_hash to numeric ID
-            numeric_id = int(hashlib.sha256(content_hash.encode()).hexdigest()[:15], 16)
+            numeric_id = _point_id(content_hash)
 
             result = self.client.retrieve(
                 collection_name=self.collection_name,
@@ -199,11 +302,97 @@ class QdrantVectorStore:
             logger.error(f"Error retrieving vector {content_hash}: {e}")
             return None
 
+    def get_payloads(
+        self, content_hashes: Sequence[str], payload_fields: Sequence[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch selected payload fields of stored points in a single request.
+
+        Vectors are not transferred.
+
+        Args:
+            content_hashes: Content hashes of the points to fetch
+            payload_fields: Payload fields returned for each point
+
+        Returns:
+            Payload by content hash, for the points that exist
+        """
+        try:
+            hashes_by_id = {
+                _point_id(content_hash): content_hash for content_hash in content_hashes
+            }
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(hashes_by_id),
+                with_payload=list(payload_fields),
+                with_vectors=False,
+            )
+            return {hashes_by_id[record.id]: record.payload or {} for record in records}
+
+        except Exception as e:
+            logger.error(f"Error retrieving payloads: {e}")
+            return {}
+
+    def set_payloads(self, payloads: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Update payload fields of existing points in a single request.
+
+        Args:
+            payloads: Payload fields to set, by content hash
+        """
+        try:
+            operations = [
+                SetPayloadOperation(
+                    set_payload=SetPayload(
+                        payload=payload,
+                        points=[_point_id(content_hash)],
+                    )
+                )
+                for content_hash, payload in payloads.items()
+            ]
+            results = self.client.batch_update_points(
+                collection_name=self.collection_name, update_operations=operations
+            )
+            return all(result.status == UpdateStatus.COMPLETED for result in results)
+
+        except Exception as e:
+            logger.error(f"Error updating payloads: {e}")
+            return False
+
+    def delete_except(
+        self, content_hashes: Sequence[str], filters: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Delete every point not listed, in a single request.
+
+        Args:
+            content_hashes: Content hashes of the points to keep
+            filters: Optional payload values limiting which points are deleted
+        """
+        try:
+            keep_ids = [_point_id(content_hash) for content_hash in content_hashes]
+            selector = Filter(
+                must=[
+                    FieldCondition(key=key, match=MatchValue(value=value))
+                    for key, value in (filters or {}).items()
+                ]
+                or None,
+                must_not=[HasIdCondition(has_id=keep_ids)],
+            )
+            result = self.client.delete(
+                collection_name=self.collection_name, points_selector=selector
+            )
+            return result.status == UpdateStatus.COMPLETED
+
+        except Exception as e:
+            logger.error(f"Error deleting stale vectors: {e}")
+            return False
+
     def exists(self, content_hash: str) -> bool:
         """Check if a vector exists by content hash."""
         try:
             # Convert content_hash to numeric ID
-            numeric_id = int(hashlib.sha256(content_hash.encode()).hexdigest()[:15], 16)
+            numeric_id = _point_id(content_hash)
 
             result = self.client.retrieve(
                 collection_name=self.collection_name, ids=[numeric_id]
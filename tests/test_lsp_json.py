@@ -0,0 +1,90 @@
+"""
+Tests for the orjson transport that processing.lsp_resolver installs into multilspy.
+"""
+
+import asyncio
+import json
+import types
+
+import pytest
+
+pytest.importorskip("orjson")
+pytest.importorskip("multilspy")
+
+from multilspy import language_server  # noqa: E402
+from multilspy.lsp_protocol_handler import server  # noqa: E402
+
+import processing.lsp_resolver  # noqa: E402,F401  (installs the transport)
+
+DEFINITION_PARAMS = {
+    "textDocument": {"uri": "file:///repo/src/módulo.py"},
+    "position": {"line": 12, "character": 4},
+}
+
+DEFINITION_RESULT = [
+    {
+        "uri": "file:///repo/src/útil.py",
+        "range": {
+            "start": {"line": 3, "character": 0},
+            "end": {"line": 3, "character": 9},
+        },
+    }
+]
+
+
+class RecordingStdin:
+    """Language server stdin that keeps the messages written to it."""
+
+    def __init__(self):
+        self.messages = []
+
+    def writelines(self, parts):
+        self.messages.append(b"".join(parts))
+
+    async def drain(self):
+        pass
+
+
+def stdlib_body(payload):
+    """Encode a message body the way multilspy does with the json module."""
+    return json.dumps(
+        payload, check_circular=False, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def test_multilspy_transport_uses_orjson():
+    assert server.json is not json
+    assert language_server.json is not json
+
+
+def test_definition_round_trips_through_patched_transport():
+    stdin = RecordingStdin()
+    handler = server.LanguageServerHandler(server.ProcessLaunchInfo(cmd="true"))
+    handler.process = types.SimpleNamespace(stdin=stdin)
+
+    async def round_trip():
+        request = asyncio.ensure_future(handler.send.definition(DEFINITION_PARAMS))
+        while not stdin.messages:
+            await asyncio.sleep(0)
+
+        _, body = stdin.messages[0].split(b"\r\n\r\n", 1)
+        request_id = json.loads(body)["id"]
+        response = {"jsonrpc": "2.0", "id": request_id, "result": DEFINITION_RESULT}
+        await handler._handle_body(stdlib_body(response))
+        return body, request_id, await request
+
+    body, request_id, result = asyncio.run(round_trip())
+
+    expected_request = server.make_request(
+        "textDocument/definition", request_id, DEFINITION_PARAMS
+    )
+    assert body == stdlib_body(expected_request)
+    assert result == json.loads(stdlib_body(DEFINITION_RESULT))
+
+
+def test_sort_keys_is_honoured():
+    # multilspy dedupes completions by comparing their sorted-key JSON
+    dumps = language_server.json.dumps
+    assert dumps({"b": 1, "a": 2}, sort_keys=True) == dumps(
+        {"a": 2, "b": 1}, sort_keys=True
+    )
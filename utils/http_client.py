@@ -0,0 +1,72 @@
+"""Shared HTTP client for outbound requests such as GitHub diff downloads."""
+
+import asyncio
+from typing import Optional
+
+import httpx
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+HTTP_TIMEOUT_SECONDS = 30.0
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# Ask GitHub for the raw diff instead of a converted representation
+GITHUB_DIFF_HEADERS = {"Accept": "application/vnd.github.v3.diff"}
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP/2 client, keeping connections alive between requests.
+
+    Pooled connections belong to the event loop they were opened on, so a new
+    client is created when called from a different loop, and the previous one
+    is closed. Whoever runs the event loop must await close_http_client() before
+    it ends, as the API lifespan does.
+
+    Returns:
+        The AsyncClient for the running event loop
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop:
+        if _http_client is not None:
+            _close_on_loop(_http_client, _http_client_loop)
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=HTTP_TIMEOUT_SECONDS,
+            limits=HTTP_LIMITS,
+            follow_redirects=True,
+        )
+        _http_client_loop = loop
+        logger.debug("Created shared HTTP client")
+    return _http_client
+
+
+def _close_on_loop(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+    """Close a client replaced by one for another loop, on the loop it belongs to."""
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        logger.debug("Closing shared HTTP client of another event loop")
+    else:
+        # Its connections can only be closed by the loop that opened them
+        logger.warning(
+            "Shared HTTP client was not closed before its event loop stopped; "
+            "await close_http_client() before the loop ends"
+        )
+
+
+async def close_http_client():
+    """Close the shared HTTP client if one is open."""
+    global _http_client, _http_client_loop
+    if _http_client is not None:
+        if _http_client_loop is asyncio.get_running_loop():
+            await _http_client.aclose()
+        else:
+            _close_on_loop(_http_client, _http_client_loop)
+        _http_client = None
+        _http_client_loop = None